@@ -0,0 +1,140 @@
+"""
+Admission control for overload: per-client token buckets and priority-aware
+load shedding.
+
+Every request is classified as critical, normal or low priority. Each
+(client, route) pair gets a token bucket whose rate depends on that priority,
+so one noisy client cannot starve the others. Independently, `LoadShedder`
+tracks requests in flight and a smoothed latency (proxy queue delay plus
+handler time). As either nears its limit, low-priority requests are refused
+first, then normal ones; critical requests are only refused at the hard
+in-flight cap. Refusals are cheap and carry a Retry-After, so clients back off
+instead of piling up behind a request that will time out anyway.
+
+State is per worker process.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+CRITICAL = 'critical'
+NORMAL = 'normal'
+LOW = 'low'
+PRIORITIES = (CRITICAL, NORMAL, LOW)
+
+# Share of capacity a priority may use before it is shed (1.0 = only the hard cap)
+SHED_THRESHOLDS = {CRITICAL: 1.0, NORMAL: 0.85, LOW: 0.6}
+# Base Retry-After in seconds for shed requests, scaled up with the overload
+SHED_RETRY_AFTER = {CRITICAL: 1, NORMAL: 2, LOW: 5}
+MAX_RETRY_AFTER = 60
+
+
+def parse_request_start(value, now=None):
+    """
+    Seconds spent queued in front of the app, from a proxy's X-Request-Start
+    header ('t=1700000000.123', or epoch ms/µs); None if absent or malformed.
+    """
+    if not value:
+        return None
+    try:
+        started = float(value.strip().removeprefix('t='))
+    except ValueError:
+        return None
+    if started > 1e14:
+        started /= 1e6
+    elif started > 1e11:
+        started /= 1e3
+    return max((now or time.time()) - started, 0.0)
+
+
+class TokenBucketLimiter:
+    """Token buckets keyed by (client, route), with a refill rate per priority"""
+
+    def __init__(self, rates, burst_seconds=2.0, max_buckets=10000):
+        # priority -> tokens per second; 0 or missing disables limiting for it
+        self.rates = rates
+        self.burst_seconds = burst_seconds
+        self.max_buckets = max_buckets
+        # key -> [tokens, monotonic time of last refill]
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key, priority):
+        """Take one token; returns 0 if allowed, else the seconds until one is available"""
+        rate = self.rates.get(priority) or 0
+        if rate <= 0:
+            return 0
+        capacity = max(rate * self.burst_seconds, 1.0)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [capacity, now]
+                if len(self._buckets) > self.max_buckets:
+                    # Least recently used buckets are the idle ones, already refilled
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / rate
+
+    def size(self):
+        return len(self._buckets)
+
+
+class LoadShedder:
+    def __init__(self, max_in_flight=64, target_latency=0.5, smoothing=0.2, half_life=2.0):
+        self.max_in_flight = max_in_flight
+        self.target_latency = target_latency
+        self.smoothing = smoothing
+        # With no completions, the latency estimate halves every half_life seconds
+        self.half_life = half_life
+        self.in_flight = 0
+        self._latency = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _smoothed_latency(self, now):
+        return self._latency * 0.5 ** ((now - self._updated) / self.half_life)
+
+    def _load(self, now):
+        """(in-flight share, latency share) of capacity, 1.0 meaning at the limit"""
+        return (self.in_flight / self.max_in_flight,
+                self._smoothed_latency(now) / self.target_latency if self.target_latency > 0 else 0.0)
+
+    def try_enter(self, priority):
+        """Count the request in flight if its priority is still admitted; returns False to shed it"""
+        threshold = SHED_THRESHOLDS[priority]
+        with self._lock:
+            _, latency = self._load(time.monotonic())
+            in_flight = (self.in_flight + 1) / self.max_in_flight
+            # Critical requests ignore latency: they are what the capacity is being kept for
+            if in_flight > threshold or (priority != CRITICAL and latency > threshold):
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self, seconds):
+        """Finish an admitted request that took `seconds` (queueing included)"""
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight -= 1
+            latency = self._smoothed_latency(now)
+            self._latency = latency + self.smoothing * (seconds - latency)
+            self._updated = now
+
+    def retry_after(self, priority):
+        """Whole seconds a shed client should wait, longer for lower priorities and heavier load"""
+        with self._lock:
+            load = max(self._load(time.monotonic()))
+        return min(MAX_RETRY_AFTER, max(1, math.ceil(SHED_RETRY_AFTER[priority] * max(load, 1.0))))
+
+    def level(self):
+        """Current load as a share of capacity (the larger of in-flight and latency)"""
+        with self._lock:
+            return max(self._load(time.monotonic()))
@@ -1,20 +1,242 @@
-import requests
 import os
 import re
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, current_app, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from pymongo import MongoClient
+from werkzeug.middleware.proxy_fix import ProxyFix
+from pymongo import ReturnDocument, monitoring
 from bson import ObjectId
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
 import copy
+import math
+import threading
+import time
+from metrics import Registry
+from connections import MongoConnection, read_preference
+from singleflight import SingleFlight
+from slow_queries import SlowQueryRecorder
+from route_graph import RouteGraph
+from read_cache import ReadThroughCache, VersionStore, VERSIONS_COLLECTION
+import archival
+from ingest import GroupCommitWriter, REJECTED
+from admission import CRITICAL, NORMAL, LOW, LoadShedder, TokenBucketLimiter, parse_request_start
+from dates import parse_iso, to_iso
+from shelter_geo import add_shelter_geo
+from compression import CompressedBodyCache, available_encodings, body_digest, negotiate, COMPRESSIBLE_TYPES
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
+# Routes and hooks live on this blueprint; create_app() (bottom of the file)
+# builds the Flask app around it
+api = Blueprint('api', __name__)
+
+# ============= METRICS =============
+metrics = Registry()
+http_metrics = metrics.requests()
+mongo_command_duration = metrics.histogram(
+    'mongo_command_duration_seconds', 'MongoDB command latency', ('command',))
+mongo_command_failures_total = metrics.counter(
+    'mongo_command_failures_total', 'MongoDB commands that failed', ('command',))
+weather_upstream_duration = metrics.histogram(
+    'weather_upstream_duration_seconds', 'OpenWeatherMap call latency', ('endpoint',))
+weather_upstream_requests_total = metrics.counter(
+    'weather_upstream_requests_total', 'OpenWeatherMap calls by endpoint and status', ('endpoint', 'status'))
+weather_upstream_errors_total = metrics.counter(
+    'weather_upstream_errors_total', 'OpenWeatherMap calls that raised (timeouts, connection errors)')
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Records the latency of every command sent by the Mongo client"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1e6, event.command_name)
+
+    def failed(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1e6, event.command_name)
+        mongo_command_failures_total.inc(event.command_name)
+
+@api.before_app_request
+def start_request_timer():
+    request._get_current_object().environ['metrics.started'] = time.perf_counter()
+
+@api.after_app_request
+def record_request_metrics(response):
+    # Resolve the request proxy once; every proxied attribute lookup costs about a microsecond
+    req = request._get_current_object()
+    environ = req.environ
+    started = environ.pop('metrics.started', None)
+    if started is not None:
+        request_size = environ.get('CONTENT_LENGTH')
+        http_metrics.observe(
+            req.method,
+            req.url_rule.rule if req.url_rule is not None else 'unmatched',
+            response.status_code,
+            time.perf_counter() - started,
+            int(request_size) if request_size else 0,
+            0 if response.is_streamed else (response.calculate_content_length() or 0)
+        )
+    return response
+
+# ============= RESPONSE COMPRESSION =============
+# Registered after the metrics hook, so it runs first and the recorded response
+# size is the size on the wire. Identical bodies share one compressed copy.
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+COMPRESSION_CACHE_MB = int(os.getenv('COMPRESSION_CACHE_MB', '32'))
+COMPRESSION_ENCODINGS = available_encodings()
+compressed_bodies = CompressedBodyCache(max_bytes=COMPRESSION_CACHE_MB * 1024 * 1024)
+compression_input_bytes = metrics.counter(
+    'http_compression_input_bytes_total', 'Response bytes before compression', ('encoding',))
+compression_output_bytes = metrics.counter(
+    'http_compression_output_bytes_total', 'Response bytes after compression', ('encoding',))
+compression_cpu = metrics.histogram(
+    'http_compression_cpu_seconds', 'CPU time spent compressing a response body (cache misses only)',
+    ('encoding',), (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1))
+metrics.gauge('http_compression_ratio', 'Compressed bytes sent per uncompressed byte',
+              lambda: compression_output_bytes.total() / (compression_input_bytes.total() or 1))
+metrics.gauge('http_compression_cache_hit_rate', 'Share of compressed responses served from the body cache',
+              lambda: compressed_bodies.stats()['hitRate'])
+metrics.gauge('http_compression_cache_bytes', 'Bytes held by the compressed body cache',
+              lambda: compressed_bodies.bytes)
+
+@api.after_app_request
+def compress_response(response):
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)):
+        return response
+    req = request._get_current_object()
+    body = response.get_data()
+    digest = body_digest(body)
+    if req.method == 'GET':
+        # Weak, so it still matches whichever encoding the client got
+        response.set_etag(digest, weak=True)
+        response.make_conditional(req)
+        if response.status_code == 304:
+            return response
+    response.vary.add('Accept-Encoding')
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return response
+    encoding = negotiate(req.headers.get('Accept-Encoding'), COMPRESSION_ENCODINGS)
+    if encoding is None:
+        return response
+    compressed, cpu_seconds = compressed_bodies.get(digest, body, encoding)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    compression_input_bytes.inc(encoding, amount=len(body))
+    compression_output_bytes.inc(encoding, amount=len(compressed))
+    if cpu_seconds is not None:
+        compression_cpu.observe(cpu_seconds, encoding)
+    return response
+
+# ============= ADMISSION CONTROL =============
+# Under overload, alert creation, critical incident writes and urgent messages
+# are admitted first; bulk reads and weather are shed first (see admission.py).
+# Rate-limited requests get 429, shed ones 503, both with Retry-After.
+# Per-client limits are off unless configured: buckets are keyed on the client
+# address, which behind a proxy is only the real client's if TRUSTED_PROXY_COUNT
+# says how many X-Forwarded-For hops to trust.
+RATE_LIMITS = {
+    CRITICAL: float(os.getenv('RATE_LIMIT_CRITICAL_RPS', '0')),
+    NORMAL: float(os.getenv('RATE_LIMIT_NORMAL_RPS', '0')),
+    LOW: float(os.getenv('RATE_LIMIT_LOW_RPS', '0'))
+}
+TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', '0'))
+rate_limiter = TokenBucketLimiter(RATE_LIMITS, burst_seconds=float(os.getenv('RATE_LIMIT_BURST_SECONDS', '2')))
+load_shedder = LoadShedder(
+    max_in_flight=int(os.getenv('SHED_MAX_IN_FLIGHT', '64')),
+    target_latency=float(os.getenv('SHED_TARGET_LATENCY_MS', '500')) / 1000
+)
+# Probes and scrapes must keep answering under overload
+UNGOVERNED_PATHS = {'/api/health', '/api/ready', '/api/metrics'}
+# GETs that answer an operational question rather than list a collection
+OPERATIONAL_READS = (
+    re.compile(r'/api/alerts/[0-9a-fA-F]{24}'),
+    re.compile(r'/api/shelters/available'),
+    re.compile(r'/api/evacuation-routes/shortest-path')
+)
+requests_rate_limited = metrics.counter(
+    'http_requests_rate_limited_total', 'Requests refused with 429 by the per-client rate limit', ('priority',))
+requests_shed = metrics.counter(
+    'http_requests_shed_total', 'Requests refused with 503 by load shedding', ('priority',))
+metrics.gauge('http_requests_in_flight', 'Admitted requests currently being handled', lambda: load_shedder.in_flight)
+metrics.gauge('http_load_level', 'Load as a share of capacity (low priority is shed from 0.6, normal from 0.85)',
+              load_shedder.level)
+metrics.gauge('rate_limit_buckets', 'Client/route token buckets held in memory', rate_limiter.size)
+
+def request_priority(method, path, body=None):
+    """critical, normal or low for one API call; None for calls that are never limited or shed"""
+    path = path.split('?', 1)[0].rstrip('/')
+    if method == 'OPTIONS' or path in UNGOVERNED_PATHS:
+        return None
+    if path == '/api/batch':
+        # Each sub-request is admitted and charged at its own priority instead
+        return None
+    if method == 'GET':
+        return NORMAL if any(pattern.fullmatch(path) for pattern in OPERATIONAL_READS) else LOW
+    if method == 'POST' and path in ('/api/alerts', '/api/alerts/ingest'):
+        return CRITICAL
+    body = body if isinstance(body, dict) else {}
+    if path.startswith('/api/incidents') and method in ('POST', 'PUT') and body.get('severity') == 'critical':
+        return CRITICAL
+    if path in ('/api/messages', '/api/messages/broadcast') and method == 'POST' and body.get('priority') == 'urgent':
+        return CRITICAL
+    return NORMAL
+
+def refuse(status, message, priority, retry_after):
+    response = jsonify({'error': message, 'priority': priority})
+    response.status_code = status
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+@api.before_app_request
+def admit_request():
+    req = request._get_current_object()
+    environ = req.environ
+    priority = request_priority(req.method, req.path, req.get_json(silent=True) if req.is_json else None)
+    if priority is None:
+        return None
+    route = req.url_rule.rule if req.url_rule is not None else 'unmatched'
+    wait = rate_limiter.acquire((req.remote_addr, req.method, route), priority)
+    if wait:
+        requests_rate_limited.inc(priority)
+        return refuse(429, 'Rate limit exceeded, retry later', priority, math.ceil(wait))
+    if not load_shedder.try_enter(priority):
+        requests_shed.inc(priority)
+        return refuse(503, 'Server is overloaded, retry later', priority, load_shedder.retry_after(priority))
+    # Time spent queued in a proxy in front of us counts towards the latency signal
+    queued = parse_request_start(req.headers.get('X-Request-Start')) or 0.0
+    environ['admission.started'] = time.perf_counter() - queued
+    return None
+
+@api.teardown_app_request
+def release_admission(exc):
+    started = request.environ.pop('admission.started', None)
+    if started is not None:
+        load_shedder.leave(time.perf_counter() - started)
 
 # MongoDB Configuration
 MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
-client = MongoClient(MONGO_URI)
-db = client['disaster_management']
+MONGO_DB_NAME = os.getenv('MONGO_DB_NAME', 'disaster_management')
+# Commands slower than SLOW_QUERY_MS are kept (values redacted) with a sampled explain plan
+slow_queries = SlowQueryRecorder(
+    threshold_ms=float(os.getenv('SLOW_QUERY_MS', '100')),
+    capacity=int(os.getenv('SLOW_QUERY_CAPACITY', '200')),
+    explain_sample_rate=float(os.getenv('SLOW_QUERY_EXPLAIN_RATE', '1.0'))
+)
+# Read endpoints that tolerate slightly stale data may be served by secondaries
+# (e.g. MONGO_READ_PREFERENCE=secondaryPreferred); writes always go to the primary
+MONGO_READ_PREFERENCE = os.getenv('MONGO_READ_PREFERENCE', 'primary')
+# Validated by read_preference() at import, so a bad value fails startup rather than the first read
+MONGO_MAX_STALENESS_SECONDS = os.getenv('MONGO_MAX_STALENESS_SECONDS', '-1')
+# The client is created on first use in each process (see connections.py), so
+# importing this module or forking workers never shares sockets or threads
+mongo = MongoConnection(MONGO_URI, MONGO_DB_NAME, on_connect=slow_queries.attach,
+                        read_preference=read_preference(MONGO_READ_PREFERENCE, MONGO_MAX_STALENESS_SECONDS),
+                        event_listeners=[MongoCommandMetrics(), slow_queries])
+db = mongo.database()
+replica_db = mongo.database(reads=True)
 
 # Collections
 alerts_collection = db['alerts']
@@ -25,6 +247,47 @@ evacuation_plans_collection = db['evacuation_plans']
 messages_collection = db['messages']
 users_collection = db['users']
 weather_collection = db['weather']
+cache_versions_collection = db[VERSIONS_COLLECTION]
+
+def primary_required():
+    """Clients send X-Read-Preference: primary for a while after writing, to read their own writes"""
+    return request.headers.get('X-Read-Preference', '').lower() == 'primary'
+
+def reads():
+    """Database for staleness-tolerant reads: the configured read preference unless the client needs the primary"""
+    return db if primary_required() else replica_db
+
+def ensure_indexes():
+    """Create the indexes the API relies on (no-op when they already exist)"""
+    # Full-text search: Mongo allows a single text index per collection
+    alerts_collection.create_index(
+        [('title', 'text'), ('description', 'text'), ('location', 'text')],
+        name='alerts_text', weights={'title': 5, 'location': 2}
+    )
+    incidents_collection.create_index(
+        [('title', 'text'), ('description', 'text'), ('location', 'text')],
+        name='incidents_text', weights={'title': 5, 'location': 2}
+    )
+    messages_collection.create_index(
+        [('subject', 'text'), ('content', 'text')],
+        name='messages_text', weights={'subject': 3}
+    )
+    # Shelter finder: nearest shelters across all evacuation plans
+    evacuation_plans_collection.create_index([('shelters.geo', '2dsphere')])
+    # Heatmap time windows and bounding boxes
+    incidents_collection.create_index([('createdAt', -1)])
+    incidents_collection.create_index([('coordinates.lat', 1), ('coordinates.lng', 1)])
+    # Archival policy scans and the newest-first message list
+    for collection in (alerts_collection, incidents_collection):
+        collection.create_index([('status', 1), ('updatedAt', 1)])
+    messages_collection.create_index([('timestamp', -1)])
+    # Broadcast acknowledgements select by broadcast or by recipient and status
+    messages_collection.create_index('broadcastId', sparse=True)
+    messages_collection.create_index([('to', 1), ('status', 1)])
+    archival.ensure_archive_indexes(db)
+    # Status filters used by analytics, stats and the list screens
+    for collection in (alerts_collection, incidents_collection, resources_collection, teams_collection):
+        collection.create_index('status')
 
 # Helper function to convert ObjectId to string
 def serialize_doc(doc):
@@ -33,265 +296,946 @@ def serialize_doc(doc):
         del doc['_id']
     return doc
 
+# ============= DATES =============
+# Timestamps are stored as native BSON dates and leave the API in the same
+# ISO format as before ('2024-01-15T10:30:00.123000Z').
+DATE_FIELDS = ('createdAt', 'updatedAt', 'timestamp', 'lastUpdated', 'lastActive')
+
+def parse_dates(data):
+    """Turn ISO strings sent back by clients into datetimes before they are stored"""
+    for field in DATE_FIELDS:
+        if isinstance(data.get(field), str):
+            try:
+                data[field] = parse_iso(data[field])
+            except ValueError:
+                pass
+    return data
+
+class JSONProvider(DefaultJSONProvider):
+    @staticmethod
+    def default(o):
+        if isinstance(o, datetime):
+            return to_iso(o)
+        # References such as broadcastId are stored as ObjectIds
+        if isinstance(o, ObjectId):
+            return str(o)
+        return DefaultJSONProvider.default(o)
+
+
+# ============= COLLECTION VERSIONS =============
+# Every write that changed something bumps its collection's version so caches
+# derived from that collection know they must be recomputed. Versions live in Mongo so all
+# worker processes agree; each worker re-reads a version at most once per
+# CACHE_VERSION_CHECK_SECONDS and sees its own writes immediately.
+CACHE_VERSION_CHECK_SECONDS = float(os.getenv('CACHE_VERSION_CHECK_SECONDS', '1.0'))
+collection_versions = VersionStore(cache_versions_collection, check_interval=CACHE_VERSION_CHECK_SECONDS)
+
+def mark_collection_changed(name):
+    """Call after the write; returns a version that covers it"""
+    return collection_versions.bump(name)
+
+def collection_version(name):
+    return collection_versions.current(name)
+
+# ============= REQUEST COALESCING =============
+# Concurrent identical GETs (same route and query) within this worker share
+# one execution of the handler instead of each hitting Mongo or the weather API.
+singleflight = SingleFlight()
+metrics.gauge('mongo_slow_operations', 'MongoDB commands slower than SLOW_QUERY_MS',
+              lambda: slow_queries.total)
+metrics.gauge('singleflight_requests', 'Requests that went through request coalescing',
+              lambda: singleflight.stats()['requests'])
+metrics.gauge('singleflight_executions', 'Handler executions performed for coalesced routes',
+              lambda: singleflight.stats()['executions'])
+metrics.gauge('singleflight_coalescing_ratio', 'Share of coalesced-route requests served by another request',
+              lambda: singleflight.stats()['coalescingRatio'])
+metrics.gauge('singleflight_in_flight', 'Coalesced computations currently running', singleflight.in_flight)
+
+def normalized_query():
+    """Query string as a hashable, order-independent key"""
+    return tuple(sorted(request.args.items(multi=True)))
+
+def coalesce(view):
+    """Run the view once for all concurrent requests with the same route and query"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        def execute():
+            # Freeze the response into plain values so every waiter can build its own
+            response = current_app.make_response(view(*args, **kwargs))
+            headers = [(k, v) for k, v in response.headers.items() if k != 'Content-Length']
+            return response.get_data(), response.status_code, headers
+        key = (request.path, normalized_query(), primary_required())
+        body, status, headers = singleflight.do(key, execute)
+        return current_app.response_class(body, status=status, headers=headers)
+    return wrapper
+
+# ============= READ-THROUGH CACHE =============
+# Teams, resources and evacuation plans change rarely but are listed constantly;
+# their serialized JSON is kept until the collection version moves.
+read_cache = ReadThroughCache(collection_versions, singleflight)
+metrics.gauge('read_cache_hits', 'List responses served from the read-through cache',
+              lambda: read_cache.stats()['hits'])
+metrics.gauge('read_cache_misses', 'List responses loaded from Mongo by the read-through cache',
+              lambda: read_cache.stats()['misses'])
+metrics.gauge('read_cache_hit_rate', 'Share of cached list reads served without loading from Mongo',
+              lambda: read_cache.stats()['hitRate'])
+metrics.gauge('read_cache_bytes', 'Serialized bytes held by the read-through cache',
+              lambda: read_cache.stats()['bytes'])
+metrics.gauge('cache_version_checks', 'Shared collection version lookups made against Mongo',
+              lambda: collection_versions.checks)
+metrics.gauge('cache_version_bumps', 'Version increments sent to Mongo after coalescing concurrent writes',
+              lambda: collection_versions.bumps)
+
+def cached_list(name, collection):
+    """Whole collection as a JSON response, served from the read-through cache"""
+    # Loads stay on the primary: a lagging secondary read would be cached under the new version
+    body = read_cache.get(name, name, lambda: jsonify([serialize_doc(doc) for doc in collection.find()]).get_data())
+    return current_app.response_class(body, mimetype='application/json')
+
+# ============= ARCHIVED DATA =============
+# Old resolved alerts/incidents and old messages live in <name>_archive (see
+# archival.py). Lists read only the hot collection unless ?includeArchived=true.
+# Analytics, /stats and the heatmap always cover the hot collections only.
+ARCHIVED_LIST_LIMIT = int(os.getenv('ARCHIVED_LIST_LIMIT', '1000'))
+
+def include_archived():
+    return request.args.get('includeArchived', '').lower() in ('1', 'true', 'yes')
+
+def list_documents(name, sort=None):
+    """
+    Hot documents, or with ?includeArchived=true the first ?limit (at most
+    ARCHIVED_LIST_LIMIT) of hot and archived ones, newest first unless `sort`
+    says otherwise. The hot copy wins if a move was interrupted.
+    """
+    source = reads()
+    if not include_archived():
+        docs = source[name].find().sort(*sort) if sort else source[name].find()
+        return [serialize_doc(doc) for doc in docs]
+
+    order = {sort[0]: sort[1]} if sort else {'_id': -1}
+    limit = min(max(request.args.get('limit', ARCHIVED_LIST_LIMIT, type=int), 1), ARCHIVED_LIST_LIMIT)
+    # Each side is sorted and cut to the limit before they are merged, all inside Mongo
+    pipeline = [
+        {'$sort': order},
+        {'$limit': limit},
+        {'$unionWith': {'coll': archival.archive_name(name), 'pipeline': [
+            {'$sort': order},
+            {'$limit': limit},
+            {'$lookup': {'from': name, 'localField': '_id', 'foreignField': '_id', 'as': 'hotCopy'}},
+            {'$match': {'hotCopy': {'$size': 0}}},
+            {'$project': {'hotCopy': 0}}
+        ]}},
+        {'$sort': order},
+        {'$limit': limit}
+    ]
+    return [serialize_doc(doc) for doc in source[name].aggregate(pipeline)]
+
+def find_including_archive(name, doc_id):
+    return db[name].find_one({'_id': doc_id}) or db[archival.archive_name(name)].find_one({'_id': doc_id})
+
 # ============= ALERTS ENDPOINTS =============
-@app.route('/api/alerts', methods=['GET'])
+@api.route('/api/alerts', methods=['GET'])
+@coalesce
 def get_alerts():
     try:
-        alerts = list(alerts_collection.find())
-        return jsonify([serialize_doc(alert) for alert in alerts]), 200
+        return jsonify(list_documents('alerts')), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/alerts/<alert_id>', methods=['GET'])
+@api.route('/api/alerts/<alert_id>', methods=['GET'])
 def get_alert(alert_id):
     try:
-        alert = alerts_collection.find_one({'_id': ObjectId(alert_id)})
+        alert = find_including_archive('alerts', ObjectId(alert_id))
         if alert:
             return jsonify(serialize_doc(alert)), 200
         return jsonify({'error': 'Alert not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/alerts', methods=['POST'])
+@api.route('/api/alerts', methods=['POST'])
 def create_alert():
     try:
         data = copy.deepcopy(request.json)
-        data['createdAt'] = datetime.utcnow().isoformat() + 'Z'
-        data['updatedAt'] = datetime.utcnow().isoformat() + 'Z'
+        data['createdAt'] = datetime.utcnow()
+        data['updatedAt'] = datetime.utcnow()
         result = alerts_collection.insert_one(data)
+        mark_collection_changed('alerts')
         # Fetch the created document to ensure proper serialization
         created_alert = alerts_collection.find_one({'_id': result.inserted_id})
         return jsonify(serialize_doc(created_alert)), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/alerts/<alert_id>', methods=['PUT'])
+@api.route('/api/alerts/<alert_id>', methods=['PUT'])
 def update_alert(alert_id):
     try:
-        data = request.json
-        data['updatedAt'] = datetime.utcnow().isoformat() + 'Z'
+        data = parse_dates(request.json)
+        data['updatedAt'] = datetime.utcnow()
         result = alerts_collection.update_one(
             {'_id': ObjectId(alert_id)},
             {'$set': data}
         )
+        if result.modified_count:
+            mark_collection_changed('alerts')
         if result.matched_count:
             return jsonify({'message': 'Alert updated successfully'}), 200
         return jsonify({'error': 'Alert not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/alerts/<alert_id>', methods=['DELETE'])
+@api.route('/api/alerts/<alert_id>', methods=['DELETE'])
 def delete_alert(alert_id):
     try:
         result = alerts_collection.delete_one({'_id': ObjectId(alert_id)})
         if result.deleted_count:
+            mark_collection_changed('alerts')
             return jsonify({'message': 'Alert deleted successfully'}), 200
         return jsonify({'error': 'Alert not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# ============= ALERT INGESTION =============
+# High-rate producers (sensor networks, partner agencies) POST to
+# /api/alerts/ingest. Alerts are acknowledged once queued and written by a
+# background thread in group commits; repeats within the dedup window collapse.
+alert_ingest_total = metrics.counter(
+    'alert_ingest_total', 'Alerts submitted for ingestion by outcome', ('outcome',))
+alert_ingest_flush_duration = metrics.histogram(
+    'alert_ingest_flush_seconds', 'Time to write one group commit of ingested alerts')
+alert_ingest_batch_size = metrics.histogram(
+    'alert_ingest_batch_size', 'Alerts per group commit', buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000))
+
+def alerts_flushed(inserted, seconds, batch_size):
+    alert_ingest_flush_duration.observe(seconds)
+    alert_ingest_batch_size.observe(batch_size)
+    if inserted:
+        mark_collection_changed('alerts')
+
+alert_ingest = GroupCommitWriter(
+    alerts_collection,
+    max_queue=int(os.getenv('ALERT_INGEST_QUEUE', '10000')),
+    batch_size=int(os.getenv('ALERT_INGEST_BATCH', '500')),
+    flush_interval=float(os.getenv('ALERT_INGEST_FLUSH_MS', '50')) / 1000,
+    dedup_window=float(os.getenv('ALERT_DEDUP_SECONDS', '300')),
+    on_flush=alerts_flushed,
+    on_outcome=alert_ingest_total.inc
+)
+metrics.gauge('alert_ingest_queue_depth', 'Alerts accepted but not yet written', alert_ingest.depth)
+metrics.gauge('alert_ingest_failed', 'Ingested alerts dropped after all write retries',
+              lambda: alert_ingest.failed)
+
+@api.route('/api/alerts/ingest', methods=['POST'])
+def ingest_alerts():
+    """
+    Queue one alert or a list of alerts. Returns 202 with one result per alert
+    ({id, status: accepted|duplicate|rejected}); 429 with Retry-After if any
+    alert was rejected because the queue is full.
+    """
+    try:
+        payload = request.get_json(silent=True)
+        items = payload if isinstance(payload, list) else [payload]
+        if not items or not all(isinstance(item, dict) for item in items):
+            return jsonify({'error': 'Body must be an alert object or a list of them'}), 400
+
+        results = []
+        for item in items:
+            data = copy.deepcopy(item)
+            # Ids are always assigned server-side, so a client can't collide with an existing alert
+            data.pop('id', None)
+            data.pop('_id', None)
+            data['createdAt'] = data['updatedAt'] = datetime.utcnow()
+            outcome, alert_id = alert_ingest.submit(data)
+            results.append({'id': str(alert_id) if alert_id else None, 'status': outcome})
+
+        rejected = sum(1 for result in results if result['status'] == REJECTED)
+        body = results if isinstance(payload, list) else results[0]
+        if rejected:
+            response = jsonify(body)
+            response.headers['Retry-After'] = '1'
+            return response, 429
+        return jsonify(body), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # ============= RESOURCES ENDPOINTS =============
-@app.route('/api/resources', methods=['GET'])
+@api.route('/api/resources', methods=['GET'])
 def get_resources():
     try:
-        resources = list(resources_collection.find())
-        return jsonify([serialize_doc(resource) for resource in resources]), 200
+        return cached_list('resources', resources_collection), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/resources', methods=['POST'])
+@api.route('/api/resources', methods=['POST'])
 def create_resource():
     try:
         data = copy.deepcopy(request.json)
         result = resources_collection.insert_one(data)
+        mark_collection_changed('resources')
         # Fetch the created document to ensure proper serialization
         created_resource = resources_collection.find_one({'_id': result.inserted_id})
         return jsonify(serialize_doc(created_resource)), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/resources/<resource_id>', methods=['PUT'])
+@api.route('/api/resources/<resource_id>', methods=['PUT'])
 def update_resource(resource_id):
     try:
-        data = request.json
+        data = parse_dates(request.json)
         result = resources_collection.update_one(
             {'_id': ObjectId(resource_id)},
             {'$set': data}
         )
+        if result.modified_count:
+            mark_collection_changed('resources')
         if result.matched_count:
             return jsonify({'message': 'Resource updated successfully'}), 200
         return jsonify({'error': 'Resource not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/resources/<resource_id>', methods=['DELETE'])
+@api.route('/api/resources/<resource_id>', methods=['DELETE'])
 def delete_resource(resource_id):
     try:
         result = resources_collection.delete_one({'_id': ObjectId(resource_id)})
         if result.deleted_count:
+            mark_collection_changed('resources')
             return jsonify({'message': 'Resource deleted successfully'}), 200
         return jsonify({'error': 'Resource not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# ============= RESOURCE RESERVATIONS =============
+# 'available' only ever changes through a conditional $inc, so concurrent
+# dispatchers cannot overwrite each other's reservations.
+def parse_count(value):
+    """Positive integer from a request body field, or None if invalid"""
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        return None
+    return value
+
+def parse_quantity(data):
+    """Positive integer 'quantity' of a JSON body, or None (also for non-object bodies)"""
+    return parse_count(data.get('quantity')) if isinstance(data, dict) else None
+
+def units_update(delta):
+    """
+    Pipeline update adding delta to 'available' and keeping 'status' in step in
+    the same atomic write: 'deployed' once nothing is left, back to 'available'
+    when units return to a deployed resource. Other statuses are left alone.
+    """
+    return [
+        {'$set': {'available': {'$add': ['$available', delta]}}},
+        {'$set': {'status': {'$switch': {
+            'branches': [
+                {'case': {'$lte': ['$available', 0]}, 'then': 'deployed'},
+                {'case': {'$eq': ['$status', 'deployed']}, 'then': 'available'}
+            ],
+            'default': '$status'
+        }}}}
+    ]
+
+def reserve_units(resource_id, quantity):
+    """Take units if enough are available; returns the updated resource or None"""
+    return resources_collection.find_one_and_update(
+        {'_id': resource_id, 'available': {'$gte': quantity}},
+        units_update(-quantity),
+        return_document=ReturnDocument.AFTER
+    )
+
+def release_units(resource_id, quantity):
+    """Return units unless that would exceed the resource's total quantity"""
+    return resources_collection.find_one_and_update(
+        {'_id': resource_id, '$expr': {'$lte': [{'$add': ['$available', quantity]}, '$quantity']}},
+        units_update(quantity),
+        return_document=ReturnDocument.AFTER
+    )
+
+def reservation_conflict(resource_id, quantity, action):
+    """Error body and status for a reservation or release whose condition did not match"""
+    current = resources_collection.find_one({'_id': resource_id}, {'available': 1, 'quantity': 1})
+    if not current:
+        return {'error': 'Resource not found'}, 404
+    return {
+        'error': f'Cannot {action} {quantity} units',
+        'available': current.get('available'),
+        'quantity': current.get('quantity')
+    }, 409
+
+@api.route('/api/resources/<resource_id>/reserve', methods=['POST'])
+def reserve_resource(resource_id):
+    try:
+        quantity = parse_quantity(request.get_json(silent=True))
+        if quantity is None:
+            return jsonify({'error': 'quantity must be a positive integer'}), 400
+        updated = reserve_units(ObjectId(resource_id), quantity)
+        if not updated:
+            body, status = reservation_conflict(ObjectId(resource_id), quantity, 'reserve')
+            return jsonify(body), status
+        mark_collection_changed('resources')
+        return jsonify(serialize_doc(updated)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/resources/<resource_id>/release', methods=['POST'])
+def release_resource(resource_id):
+    try:
+        quantity = parse_quantity(request.get_json(silent=True))
+        if quantity is None:
+            return jsonify({'error': 'quantity must be a positive integer'}), 400
+        updated = release_units(ObjectId(resource_id), quantity)
+        if not updated:
+            body, status = reservation_conflict(ObjectId(resource_id), quantity, 'release')
+            return jsonify(body), status
+        mark_collection_changed('resources')
+        return jsonify(serialize_doc(updated)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/resources/reserve', methods=['POST'])
+def reserve_resources_batch():
+    """
+    Reserve several resources at once, all or nothing.
+
+    Each item is reserved with the same conditional $inc as the single form. If
+    any item cannot be satisfied, the items already taken are given back.
+    """
+    try:
+        data = request.get_json(silent=True)
+        items = data.get('items') if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'items must be a non-empty list'}), 400
+
+        # Merge repeated ids so each resource is updated once; validate them all before taking anything
+        requested = {}
+        for item in items:
+            quantity = parse_quantity(item) if isinstance(item, dict) else None
+            if quantity is None or not isinstance(item.get('id'), str) or not ObjectId.is_valid(item['id']):
+                return jsonify({'error': 'each item needs a valid id and a positive integer quantity'}), 400
+            requested[item['id']] = requested.get(item['id'], 0) + quantity
+
+        reserved = []
+        complete = False
+        try:
+            for resource_id, quantity in requested.items():
+                updated = reserve_units(ObjectId(resource_id), quantity)
+                if not updated:
+                    body, status = reservation_conflict(ObjectId(resource_id), quantity, 'reserve')
+                    body['id'] = resource_id
+                    return jsonify(body), status
+                reserved.append((updated['_id'], quantity, updated))
+            complete = True
+        finally:
+            # Give back whatever was taken unless every item succeeded, whatever went wrong
+            if not complete:
+                for taken_id, taken_quantity, _ in reserved:
+                    resources_collection.update_one({'_id': taken_id}, units_update(taken_quantity))
+                if reserved:
+                    mark_collection_changed('resources')
+
+        mark_collection_changed('resources')
+        return jsonify({'reserved': [serialize_doc(doc) for _, _, doc in reserved]}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # ============= INCIDENTS ENDPOINTS =============
-@app.route('/api/incidents', methods=['GET'])
+@api.route('/api/incidents', methods=['GET'])
 def get_incidents():
     try:
-        incidents = list(incidents_collection.find())
-        return jsonify([serialize_doc(incident) for incident in incidents]), 200
+        return jsonify(list_documents('incidents')), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/incidents', methods=['POST'])
+@api.route('/api/incidents', methods=['POST'])
 def create_incident():
     try:
         data = copy.deepcopy(request.json)
-        data['createdAt'] = datetime.utcnow().isoformat() + 'Z'
-        data['updatedAt'] = datetime.utcnow().isoformat() + 'Z'
+        data['createdAt'] = datetime.utcnow()
+        data['updatedAt'] = datetime.utcnow()
         result = incidents_collection.insert_one(data)
+        mark_collection_changed('incidents')
         # Fetch the created document to ensure proper serialization
         created_incident = incidents_collection.find_one({'_id': result.inserted_id})
         return jsonify(serialize_doc(created_incident)), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/incidents/<incident_id>', methods=['PUT'])
+@api.route('/api/incidents/<incident_id>', methods=['PUT'])
 def update_incident(incident_id):
     try:
-        data = request.json
-        data['updatedAt'] = datetime.utcnow().isoformat() + 'Z'
+        data = parse_dates(request.json)
+        data['updatedAt'] = datetime.utcnow()
         result = incidents_collection.update_one(
             {'_id': ObjectId(incident_id)},
             {'$set': data}
         )
+        if result.modified_count:
+            mark_collection_changed('incidents')
         if result.matched_count:
             return jsonify({'message': 'Incident updated successfully'}), 200
         return jsonify({'error': 'Incident not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/incidents/<incident_id>', methods=['DELETE'])
+@api.route('/api/incidents/<incident_id>', methods=['DELETE'])
 def delete_incident(incident_id):
     try:
         result = incidents_collection.delete_one({'_id': ObjectId(incident_id)})
         if result.deleted_count:
+            mark_collection_changed('incidents')
             return jsonify({'message': 'Incident deleted successfully'}), 200
         return jsonify({'error': 'Incident not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 # ============= TEAMS ENDPOINTS =============
-@app.route('/api/teams', methods=['GET'])
+@api.route('/api/teams', methods=['GET'])
 def get_teams():
     try:
-        teams = list(teams_collection.find())
-        return jsonify([serialize_doc(team) for team in teams]), 200
+        return cached_list('teams', teams_collection), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/teams', methods=['POST'])
+@api.route('/api/teams', methods=['POST'])
 def create_team():
     try:
         data = copy.deepcopy(request.json)
         result = teams_collection.insert_one(data)
+        mark_collection_changed('teams')
         # Fetch the created document to ensure proper serialization
         created_team = teams_collection.find_one({'_id': result.inserted_id})
         return jsonify(serialize_doc(created_team)), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/teams/<team_id>', methods=['PUT'])
+@api.route('/api/teams/<team_id>', methods=['PUT'])
 def update_team(team_id):
     try:
-        data = request.json
+        data = parse_dates(request.json)
         result = teams_collection.update_one(
             {'_id': ObjectId(team_id)},
             {'$set': data}
         )
+        if result.modified_count:
+            mark_collection_changed('teams')
         if result.matched_count:
             return jsonify({'message': 'Team updated successfully'}), 200
         return jsonify({'error': 'Team not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/teams/<team_id>', methods=['DELETE'])
+@api.route('/api/teams/<team_id>', methods=['DELETE'])
 def delete_team(team_id):
     try:
         result = teams_collection.delete_one({'_id': ObjectId(team_id)})
         if result.deleted_count:
+            mark_collection_changed('teams')
             return jsonify({'message': 'Team deleted successfully'}), 200
         return jsonify({'error': 'Team not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 # ============= EVACUATION PLANS ENDPOINTS =============
-@app.route('/api/evacuation-plans', methods=['GET'])
+@api.route('/api/evacuation-plans', methods=['GET'])
 def get_evacuation_plans():
     try:
-        plans = list(evacuation_plans_collection.find())
-        return jsonify([serialize_doc(plan) for plan in plans]), 200
+        return cached_list('evacuation_plans', evacuation_plans_collection), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/evacuation-plans', methods=['POST'])
+@api.route('/api/evacuation-plans', methods=['POST'])
 def create_evacuation_plan():
     try:
         data = copy.deepcopy(request.json)
-        data['lastUpdated'] = datetime.utcnow().isoformat() + 'Z'
+        data['lastUpdated'] = datetime.utcnow()
+        add_shelter_geo(data)
         result = evacuation_plans_collection.insert_one(data)
+        mark_collection_changed('evacuation_plans')
+        if data.get('routes'):
+            routes_changed(result.inserted_id, data['routes'])
         # Fetch the created document to ensure proper serialization
         created_plan = evacuation_plans_collection.find_one({'_id': result.inserted_id})
         return jsonify(serialize_doc(created_plan)), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/evacuation-plans/<plan_id>', methods=['PUT'])
+@api.route('/api/evacuation-plans/<plan_id>', methods=['PUT'])
 def update_evacuation_plan(plan_id):
     try:
-        data = request.json
-        data['lastUpdated'] = datetime.utcnow().isoformat() + 'Z'
+        data = parse_dates(request.json)
+        data['lastUpdated'] = datetime.utcnow()
+        add_shelter_geo(data)
         result = evacuation_plans_collection.update_one(
             {'_id': ObjectId(plan_id)},
             {'$set': data}
         )
+        if result.modified_count:
+            mark_collection_changed('evacuation_plans')
+            if 'routes' in data:
+                routes_changed(plan_id, data['routes'])
         if result.matched_count:
             return jsonify({'message': 'Evacuation plan updated successfully'}), 200
         return jsonify({'error': 'Evacuation plan not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/evacuation-plans/<plan_id>', methods=['DELETE'])
+@api.route('/api/evacuation-plans/<plan_id>', methods=['DELETE'])
 def delete_evacuation_plan(plan_id):
     try:
         result = evacuation_plans_collection.delete_one({'_id': ObjectId(plan_id)})
         if result.deleted_count:
+            mark_collection_changed('evacuation_plans')
+            routes_changed(plan_id, [])
             return jsonify({'message': 'Evacuation plan deleted successfully'}), 200
         return jsonify({'error': 'Evacuation plan not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# ============= SHELTER OCCUPANCY =============
+# Check-ins touch a single array element with a positional $inc instead of
+# rewriting the whole plan, and are guarded so occupancy stays within capacity.
+def find_shelter(plan_id, shelter_id):
+    plan = evacuation_plans_collection.find_one(
+        {'_id': plan_id, 'shelters.id': shelter_id},
+        {'shelters': {'$elemMatch': {'id': shelter_id}}}
+    )
+    return plan['shelters'][0] if plan and plan.get('shelters') else None
+
+def occupancy_cases(capacity, delta):
+    """
+    (element guard, status update) pairs for one occupancy change. The guards
+    don't overlap, so whichever write matches moves occupancy and the status
+    badge together: 'operational' becomes 'full' when a check-in reaches
+    capacity, and any checkout reopens a 'full' shelter.
+    """
+    if delta > 0:
+        filled = capacity - delta
+        return [
+            ({'status': 'operational', 'currentOccupancy': filled}, {'shelters.$.status': 'full'}),
+            ({'$or': [{'status': {'$ne': 'operational'}}, {'currentOccupancy': {'$lt': filled}}]}, {})
+        ]
+    return [
+        ({'status': 'full'}, {'shelters.$.status': 'operational'}),
+        ({'status': {'$ne': 'full'}}, {})
+    ]
+
+def change_occupancy(plan_id, shelter_id, delta, retries=3):
+    """
+    Atomically add delta to one shelter's occupancy, never below zero or above
+    capacity. Returns (applied, shelter) where shelter is None if it doesn't exist.
+    """
+    shelter = find_shelter(plan_id, shelter_id)
+    for _ in range(retries):
+        if not shelter:
+            return False, None
+        capacity = shelter.get('capacity', 0)
+        occupancy = shelter.get('currentOccupancy', 0)
+        if occupancy + delta > capacity or occupancy + delta < 0:
+            return False, shelter
+        # Matching on the capacity we read means a concurrent capacity edit fails the guard and retries
+        guard = {'id': shelter_id, 'capacity': capacity}
+        if delta > 0:
+            guard['currentOccupancy'] = {'$lte': capacity - delta}
+        else:
+            guard['currentOccupancy'] = {'$gte': -delta}
+        for case, status in occupancy_cases(capacity, delta):
+            update = {'$inc': {'shelters.$.currentOccupancy': delta}}
+            if status:
+                update['$set'] = status
+            updated = evacuation_plans_collection.find_one_and_update(
+                {'_id': plan_id, 'shelters': {'$elemMatch': {'$and': [guard, case]}}},
+                update,
+                projection={'shelters': {'$elemMatch': {'id': shelter_id}}},
+                return_document=ReturnDocument.AFTER
+            )
+            if updated:
+                return True, updated['shelters'][0]
+        # A concurrent change moved the shelter out of the case we tried; re-check against fresh values
+        shelter = find_shelter(plan_id, shelter_id)
+    return False, shelter
+
+def occupancy_response(plan_id, shelter_id, delta):
+    applied, shelter = change_occupancy(ObjectId(plan_id), shelter_id, delta)
+    if applied:
+        mark_collection_changed('evacuation_plans')
+        shelter.pop('geo', None)
+        return jsonify(shelter), 200
+    if not shelter:
+        return jsonify({'error': 'Shelter not found'}), 404
+    return jsonify({
+        'error': 'Not enough free capacity' if delta > 0 else 'Occupancy cannot go below zero',
+        'capacity': shelter.get('capacity'),
+        'currentOccupancy': shelter.get('currentOccupancy')
+    }), 409
+
+@api.route('/api/evacuation-plans/<plan_id>/shelters/<shelter_id>/checkin', methods=['POST'])
+def shelter_checkin(plan_id, shelter_id):
+    try:
+        count = parse_count((request.get_json(silent=True) or {}).get('count', 1))
+        if count is None:
+            return jsonify({'error': 'count must be a positive integer'}), 400
+        return occupancy_response(plan_id, shelter_id, count)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/evacuation-plans/<plan_id>/shelters/<shelter_id>/checkout', methods=['POST'])
+def shelter_checkout(plan_id, shelter_id):
+    try:
+        count = parse_count((request.get_json(silent=True) or {}).get('count', 1))
+        if count is None:
+            return jsonify({'error': 'count must be a positive integer'}), 400
+        return occupancy_response(plan_id, shelter_id, -count)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+@api.route('/api/shelters/available', methods=['GET'])
+def find_available_shelters():
+    """
+    Operational shelters with at least minFree free places across all plans,
+    nearest first when lat/lng are given, otherwise matched by location name.
+    """
+    try:
+        min_free = max(request.args.get('minFree', 1, type=int), 1)
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 200)
+        lat = request.args.get('lat', type=float)
+        lng = request.args.get('lng', type=float)
+        location = request.args.get('location')
+
+        free_capacity = {'$subtract': ['$shelters.capacity', '$shelters.currentOccupancy']}
+        has_room = {
+            'shelters.status': 'operational',
+            '$expr': {'$gte': [free_capacity, min_free]}
+        }
+        if lat is not None and lng is not None:
+            max_distance_km = request.args.get('maxDistanceKm', 50, type=float)
+            # Plans with at least one operational shelter that has room, so full ones never use up the limit
+            plan_has_room = {'$in': [True, {'$map': {
+                'input': {'$ifNull': ['$shelters', []]},
+                'as': 'shelter',
+                'in': {'$and': [
+                    {'$eq': ['$$shelter.status', 'operational']},
+                    {'$gte': [{'$subtract': ['$$shelter.capacity', '$$shelter.currentOccupancy']}, min_free]}
+                ]}
+            }}]}
+            pipeline = [
+                # Uses the shelters.geo 2dsphere index; plans come back nearest shelter first
+                {'$geoNear': {
+                    'near': {'type': 'Point', 'coordinates': [lng, lat]},
+                    'key': 'shelters.geo',
+                    'distanceField': 'nearestShelterMeters',
+                    'maxDistance': max_distance_km * 1000,
+                    'query': {'$expr': plan_has_room},
+                    'spherical': True
+                }},
+                {'$unwind': '$shelters'},
+                {'$match': has_room},
+                # Limited only once every candidate has room; the exact distance sort happens below
+                {'$limit': limit * 5}
+            ]
+        elif location:
+            pipeline = [
+                {'$match': {'shelters.location': {'$regex': re.escape(location), '$options': 'i'}}},
+                {'$unwind': '$shelters'},
+                {'$match': dict(has_room, **{'shelters.location': {'$regex': re.escape(location), '$options': 'i'}})},
+                {'$limit': limit}
+            ]
+        else:
+            return jsonify({'error': 'Provide lat and lng, or location'}), 400
+
+        pipeline.append({'$project': {'name': 1, 'shelters': 1, 'freeCapacity': free_capacity}})
+        results = []
+        # Occupancy may lag by the replica's staleness; check-in itself is decided on the primary
+        for row in reads()['evacuation_plans'].aggregate(pipeline):
+            shelter = row['shelters']
+            shelter.pop('geo', None)
+            hit = {
+                'planId': str(row['_id']),
+                'planName': row.get('name'),
+                'shelter': shelter,
+                'freeCapacity': row['freeCapacity']
+            }
+            coordinates = shelter.get('coordinates')
+            if lat is not None and lng is not None:
+                if not coordinates:
+                    continue
+                hit['distanceKm'] = round(haversine_km(lat, lng, coordinates['lat'], coordinates['lng']), 2)
+                if hit['distanceKm'] > max_distance_km:
+                    continue
+            results.append(hit)
+
+        if lat is not None and lng is not None:
+            results.sort(key=lambda hit: hit['distanceKm'])
+        return jsonify(results[:limit]), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# ============= EVACUATION ROUTES =============
+# All plans' routes form one graph kept in memory. Plan writes patch it in place
+# and only drop the cached shortest-path trees the change can affect.
+ROUTE_CONGESTION_PENALTY = float(os.getenv('ROUTE_CONGESTION_PENALTY', '2.0'))
+route_graph = RouteGraph(congestion_penalty=ROUTE_CONGESTION_PENALTY)
+metrics.gauge('route_graph_cached_trees', 'Shortest-path trees cached by the route graph',
+              lambda: route_graph.stats()['cachedTrees'])
+metrics.gauge('route_graph_tree_hits', 'Shortest-path queries answered from a cached tree',
+              lambda: route_graph.stats()['hits'])
+metrics.gauge('route_graph_tree_misses', 'Shortest-path queries that ran Dijkstra',
+              lambda: route_graph.stats()['misses'])
+metrics.gauge('route_graph_invalidations', 'Cached trees dropped by route changes',
+              lambda: route_graph.stats()['invalidations'])
+
+def ensure_route_graph():
+    """Load the graph on first use, or reload it if routes changed without being patched in"""
+    version = collection_version('evacuation_routes')
+    if not route_graph.loaded or route_graph.version != version:
+        route_graph.load(evacuation_plans_collection.find({}, {'routes': 1}), version)
+    return route_graph
+
+def routes_changed(plan_id, routes):
+    # Patched in place only if no other change was bumped since the graph's version
+    route_graph.update_plan(plan_id, routes, mark_collection_changed('evacuation_routes'))
+
+@api.route('/api/evacuation-routes/shortest-path', methods=['GET'])
+def get_shortest_path():
+    """Cheapest passable path between two places; blocked routes are skipped, congested ones penalized"""
+    try:
+        source = request.args.get('from')
+        target = request.args.get('to')
+        if not source or not target:
+            return jsonify({'error': 'from and to are required'}), 400
+        path = ensure_route_graph().shortest_path(source, target)
+        if path is None:
+            return jsonify({'error': f'No passable route from {source} to {target}'}), 404
+        return jsonify(dict(path, **{'from': source, 'to': target})), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/evacuation-routes/graph', methods=['GET'])
+def get_route_graph_stats():
+    try:
+        return jsonify(ensure_route_graph().stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # ============= MESSAGES ENDPOINTS =============
-@app.route('/api/messages', methods=['GET'])
+@api.route('/api/messages', methods=['GET'])
 def get_messages():
     try:
-        messages = list(messages_collection.find().sort('timestamp', -1))
-        return jsonify([serialize_doc(message) for message in messages]), 200
+        return jsonify(list_documents('messages', ('timestamp', -1))), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/messages', methods=['POST'])
+@api.route('/api/messages', methods=['POST'])
 def create_message():
     try:
         data = copy.deepcopy(request.json)
-        data['timestamp'] = datetime.utcnow().isoformat() + 'Z'
+        data['timestamp'] = datetime.utcnow()
         result = messages_collection.insert_one(data)
+        mark_collection_changed('messages')
         # Fetch the created document to ensure proper serialization
         created_message = messages_collection.find_one({'_id': result.inserted_id})
         return jsonify(serialize_doc(created_message)), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# ============= MESSAGE BROADCASTS =============
+# One request fans a message out to a group of recipients with a single
+# insert_many; acknowledgements move many messages along sent -> delivered -> read
+# with a single update_many.
+MAX_BROADCAST_RECIPIENTS = 10000
+RECIPIENT_SHORTCUTS = {
+    'all-teams': ({}, 'name'),
+    'team-leaders': ({}, 'leader')
+}
+# Statuses a message may be in before moving to the acknowledged status
+ACK_FROM = {'delivered': ['sent'], 'read': ['sent', 'delivered']}
+
+def resolve_recipients(recipients):
+    """A list of names, a shortcut, or {"teams": {type/status filter}, "address": "name"|"leader"}"""
+    if isinstance(recipients, list):
+        names = recipients
+    else:
+        if isinstance(recipients, str) and recipients in RECIPIENT_SHORTCUTS:
+            criteria, field = RECIPIENT_SHORTCUTS[recipients]
+        elif isinstance(recipients, dict) and isinstance(recipients.get('teams', {}), dict):
+            criteria = {key: value for key, value in recipients.get('teams', {}).items() if key in ('type', 'status')}
+            field = 'leader' if recipients.get('address') == 'leader' else 'name'
+        else:
+            raise ValueError("recipients must be a list of names, 'all-teams', 'team-leaders' or {teams, address}")
+        names = [team.get(field) for team in teams_collection.find(criteria, {field: 1})]
+    # Keep the first occurrence of each name, in order
+    return list(dict.fromkeys(str(name).strip() for name in names if name and str(name).strip()))
+
+@api.route('/api/messages/broadcast', methods=['POST'])
+def broadcast_message():
+    try:
+        data = copy.deepcopy(request.get_json(silent=True) or {})
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Body must be an object'}), 400
+        try:
+            recipients = resolve_recipients(data.pop('recipients', None))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if not recipients:
+            return jsonify({'error': 'No recipients matched'}), 400
+        if len(recipients) > MAX_BROADCAST_RECIPIENTS:
+            return jsonify({'error': f'At most {MAX_BROADCAST_RECIPIENTS} recipients per broadcast'}), 400
+
+        data.pop('to', None)
+        # Every copy gets its own server-assigned id
+        data.pop('id', None)
+        data.pop('_id', None)
+        data['timestamp'] = datetime.utcnow()
+        data['status'] = 'sent'
+        data['broadcastId'] = ObjectId()
+        result = messages_collection.insert_many([dict(data, to=name) for name in recipients], ordered=False)
+        mark_collection_changed('messages')
+        return jsonify({
+            'broadcastId': str(data['broadcastId']),
+            'recipients': len(recipients),
+            'messageIds': [str(message_id) for message_id in result.inserted_ids]
+        }), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/messages/<any(delivered, read):status>', methods=['POST'])
+def acknowledge_messages(status):
+    """
+    Mark many messages delivered or read. Body selects them by "ids", or by
+    "broadcastId" and/or recipient "to". Messages already further along are left alone.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Body must be an object'}), 400
+        criteria = {}
+        if data.get('ids'):
+            ids = data['ids']
+            if not isinstance(ids, list) or not all(isinstance(i, str) and ObjectId.is_valid(i) for i in ids):
+                return jsonify({'error': 'ids must be a list of valid message ids'}), 400
+            criteria['_id'] = {'$in': [ObjectId(message_id) for message_id in ids]}
+        if data.get('broadcastId'):
+            if not isinstance(data['broadcastId'], str) or not ObjectId.is_valid(data['broadcastId']):
+                return jsonify({'error': 'broadcastId must be a valid broadcast id'}), 400
+            criteria['broadcastId'] = ObjectId(data['broadcastId'])
+        if data.get('to'):
+            criteria['to'] = data['to']
+        if not criteria:
+            return jsonify({'error': 'Provide ids, broadcastId or to'}), 400
+
+        criteria['status'] = {'$in': ACK_FROM[status]}
+        result = messages_collection.update_many(
+            criteria, {'$set': {'status': status, f'{status}At': datetime.utcnow()}}
+        )
+        if result.modified_count:
+            mark_collection_changed('messages')
+        return jsonify({'status': status, 'matched': result.matched_count, 'modified': result.modified_count}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # ============= WEATHER ENDPOINTS =============
 # Fallback data for cities (average values per city)
 CITY_FALLBACK_DATA = {
@@ -404,7 +1348,30 @@ def get_fallback_data(city_name):
         'sunTimes': {'sunrise': '06:30', 'sunset': '18:15'}
     }
 
-@app.route('/api/weather/<location>', methods=['GET'])
+OPENWEATHER_BASE_URL = os.getenv('OPENWEATHER_BASE_URL', 'https://api.openweathermap.org').rstrip('/')
+
+def record_weather_response(response, *args, **kwargs):
+    """requests response hook: upstream latency and status per endpoint"""
+    endpoint = response.request.path_url.split('?', 1)[0].rsplit('/', 1)[-1]
+    weather_upstream_duration.observe(response.elapsed.total_seconds(), endpoint)
+    weather_upstream_requests_total.inc(endpoint, str(response.status_code))
+
+# Per-process session: keeps upstream connections alive and carries the metrics hook.
+# requests is imported on first use to keep it out of worker start-up.
+weather_sessions = {}
+
+def weather_session():
+    session = weather_sessions.get(os.getpid())
+    if session is None:
+        import requests
+        session = requests.Session()
+        session.hooks['response'].append(record_weather_response)
+        weather_sessions.clear()
+        weather_sessions[os.getpid()] = session
+    return session
+
+@api.route('/api/weather/<location>', methods=['GET'])
+@coalesce
 def get_weather(location):
     try:
         api_key = os.getenv('OPENWEATHER_API_KEY')
@@ -416,15 +1383,15 @@ def get_weather(location):
         if use_api:
             try:
                 # Get current weather
-                weather_url = f'https://api.openweathermap.org/data/2.5/weather?q={location}&appid={api_key}&units=metric'
-                weather_response = requests.get(weather_url, timeout=5)
+                weather_url = f'{OPENWEATHER_BASE_URL}/data/2.5/weather?q={location}&appid={api_key}&units=metric'
+                weather_response = weather_session().get(weather_url, timeout=5)
                 
                 if weather_response.status_code == 200:
                     weather_data = weather_response.json()
                     
                     # Get forecast
-                    forecast_url = f'https://api.openweathermap.org/data/2.5/forecast?q={location}&appid={api_key}&units=metric'
-                    forecast_response = requests.get(forecast_url, timeout=5)
+                    forecast_url = f'{OPENWEATHER_BASE_URL}/data/2.5/forecast?q={location}&appid={api_key}&units=metric'
+                    forecast_response = weather_session().get(forecast_url, timeout=5)
                     if forecast_response.status_code == 200:
                         forecast_data = forecast_response.json()
                     
@@ -432,11 +1399,12 @@ def get_weather(location):
                     if 'coord' in weather_data:
                         lat = weather_data['coord']['lat']
                         lon = weather_data['coord']['lon']
-                        air_url = f'http://api.openweathermap.org/data/2.5/air_pollution?lat={lat}&lon={lon}&appid={api_key}'
-                        air_response = requests.get(air_url, timeout=5)
+                        air_url = f'{OPENWEATHER_BASE_URL}/data/2.5/air_pollution?lat={lat}&lon={lon}&appid={api_key}'
+                        air_response = weather_session().get(air_url, timeout=5)
                         if air_response.status_code == 200:
                             air_pollution_data = air_response.json()
             except Exception as api_error:
+                weather_upstream_errors_total.inc()
                 print(f"API Error: {api_error}")
                 use_api = False
         
@@ -607,12 +1575,14 @@ def get_weather(location):
         return jsonify(result), 200
 
 # ============= ANALYTICS ENDPOINT =============
-@app.route('/api/analytics', methods=['GET'])
+@api.route('/api/analytics', methods=['GET'])
+@coalesce
 def get_analytics():
     try:
-        total_incidents = incidents_collection.count_documents({})
-        resolved_incidents = incidents_collection.count_documents({'status': 'resolved'})
-        active_incidents = incidents_collection.count_documents({'status': {'$ne': 'resolved'}})
+        incidents = reads()['incidents']
+        total_incidents = incidents.count_documents({})
+        resolved_incidents = incidents.count_documents({'status': 'resolved'})
+        active_incidents = incidents.count_documents({'status': {'$ne': 'resolved'}})
         
         analytics = {
             'totalIncidents': total_incidents,
@@ -640,8 +1610,342 @@ def get_analytics():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# ============= STATS ENDPOINTS =============
+# URL segment -> (collection name, fields whose values are counted)
+STATS_COLLECTIONS = {
+    'alerts': ('alerts', ['status', 'severity', 'type']),
+    'resources': ('resources', ['status', 'type']),
+    'incidents': ('incidents', ['status', 'severity', 'type']),
+    'teams': ('teams', ['status', 'type']),
+    'evacuation-plans': ('evacuation_plans', ['status']),
+    'messages': ('messages', ['status', 'priority'])
+}
+# collection name -> (collection version the counts were computed at, counts)
+stats_cache = {}
+
+def compute_collection_stats(name, fields):
+    """Count documents per value of each field in a single $facet aggregation"""
+    # On the primary, since the result is cached until the collection version moves
+    facets = {field: [{'$group': {'_id': '$' + field, 'count': {'$sum': 1}}}] for field in fields}
+    facets['total'] = [{'$count': 'count'}]
+    result = next(db[name].aggregate([{'$facet': facets}]), {})
+
+    total = result.get('total', [])
+    stats = {'total': total[0]['count'] if total else 0}
+    for field in fields:
+        stats[field] = {
+            str(group['_id']): group['count']
+            for group in result.get(field, []) if group['_id'] is not None
+        }
+    return stats
+
+def get_collection_stats(segment):
+    try:
+        name, fields = STATS_COLLECTIONS[segment]
+        version = collection_version(name)
+        cached = stats_cache.get(name)
+        if cached and cached[0] == version:
+            return jsonify(cached[1]), 200
+        stats = compute_collection_stats(name, fields)
+        stats_cache[name] = (version, stats)
+        return jsonify(stats), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Registered per collection so the static '/stats' path takes precedence
+# over the '/<id>' routes of the same collection
+for segment in STATS_COLLECTIONS:
+    api.add_url_rule(
+        f'/api/{segment}/stats',
+        endpoint=f'{segment}_stats',
+        view_func=lambda segment=segment: get_collection_stats(segment),
+        methods=['GET']
+    )
+
+# ============= INCIDENT HEATMAP =============
+# Incidents are binned into a lat/lng grid inside Mongo, so the response is one
+# [x, y, count] triple per non-empty cell however many incidents there are.
+# They may come from a secondary; a lagging result is kept at most HEATMAP_CACHE_SECONDS.
+# Past HEATMAP_WORLD_MAX_ZOOM a bbox is required and limited to
+# HEATMAP_MAX_BBOX_CELLS cells a side, so the payload stays bounded at any zoom.
+HEATMAP_MAX_ZOOM = 14
+HEATMAP_WORLD_MAX_ZOOM = 6
+HEATMAP_MAX_BBOX_CELLS = 256
+HEATMAP_CELLS_PER_TILE = 8
+HEATMAP_CACHE_SECONDS = int(os.getenv('HEATMAP_CACHE_SECONDS', '60'))
+HEATMAP_CACHE_SIZE = 256
+HEATMAP_SEVERITIES = ('critical', 'high', 'medium', 'low')
+heatmap_cache = {}
+heatmap_cache_lock = threading.Lock()
+
+def parse_window(value):
+    """'6h', '7d' or 'all' -> timedelta (None for all); raises ValueError otherwise"""
+    if not value or value == 'all':
+        return None
+    match = re.fullmatch(r'(\d+)([hd])', value)
+    if not match or int(match.group(1)) == 0:
+        raise ValueError('window must look like 6h, 7d or all')
+    amount = int(match.group(1))
+    return timedelta(hours=amount) if match.group(2) == 'h' else timedelta(days=amount)
+
+def heatmap_cell_size(zoom):
+    # Same cell width as HEATMAP_CELLS_PER_TILE columns of a web map tile at this zoom
+    return 360.0 / (2 ** zoom) / HEATMAP_CELLS_PER_TILE
+
+def parse_bbox(value, zoom):
+    """
+    'minLng,minLat,maxLng,maxLat' -> the same box snapped outwards to whole
+    cells (so nearby views share a cache entry), or None when absent at a low
+    zoom; raises ValueError otherwise
+    """
+    if not value:
+        if zoom > HEATMAP_WORLD_MAX_ZOOM:
+            raise ValueError(f'bbox is required above zoom {HEATMAP_WORLD_MAX_ZOOM}')
+        return None
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(','))
+    except ValueError:
+        raise ValueError('bbox must look like minLng,minLat,maxLng,maxLat')
+    if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+        raise ValueError('bbox must lie within -180..180, -90..90 with min below max')
+    cell = heatmap_cell_size(zoom)
+    x0, x1 = math.floor((min_lng + 180) / cell), math.ceil((max_lng + 180) / cell)
+    y0, y1 = math.floor((min_lat + 90) / cell), math.ceil((max_lat + 90) / cell)
+    if max(x1 - x0, y1 - y0) > HEATMAP_MAX_BBOX_CELLS:
+        raise ValueError(f'bbox spans more than {HEATMAP_MAX_BBOX_CELLS} cells a side at zoom {zoom}; zoom out')
+    return (x0 * cell - 180, y0 * cell - 90, x1 * cell - 180, y1 * cell - 90)
+
+def compute_heatmap(zoom, window, severities, bbox=None):
+    cell = heatmap_cell_size(zoom)
+    if bbox is None:
+        match = {'coordinates.lat': {'$type': 'number'}, 'coordinates.lng': {'$type': 'number'}}
+    else:
+        min_lng, min_lat, max_lng, max_lat = bbox
+        match = {'coordinates.lat': {'$gte': min_lat, '$lt': max_lat},
+                 'coordinates.lng': {'$gte': min_lng, '$lt': max_lng}}
+    if window is not None:
+        match['createdAt'] = {'$gte': datetime.utcnow() - window}
+    if severities:
+        match['severity'] = {'$in': list(severities)}
+    pipeline = [
+        {'$match': match},
+        {'$group': {
+            '_id': {
+                'x': {'$floor': {'$divide': [{'$add': ['$coordinates.lng', 180]}, cell]}},
+                'y': {'$floor': {'$divide': [{'$add': ['$coordinates.lat', 90]}, cell]}}
+            },
+            'count': {'$sum': 1}
+        }}
+    ]
+    cells = [[int(row['_id']['x']), int(row['_id']['y']), row['count']]
+             for row in reads()['incidents'].aggregate(pipeline)]
+    cells.sort()
+    return {
+        'zoom': zoom,
+        'cellSizeDeg': cell,
+        # Cell (x, y) covers lng -180 + x * cellSizeDeg and lat -90 + y * cellSizeDeg onwards
+        'origin': {'lat': -90, 'lng': -180},
+        'bbox': list(bbox) if bbox else None,
+        'total': sum(count for _, _, count in cells),
+        'max': max((count for _, _, count in cells), default=0),
+        'cells': cells
+    }
+
+@api.route('/api/incidents/heatmap', methods=['GET'])
+def get_incident_heatmap():
+    """
+    Incident counts per grid cell for ?zoom=0-14&window=24h|7d|all&severity=critical,high
+    &bbox=minLng,minLat,maxLng,maxLat (required above HEATMAP_WORLD_MAX_ZOOM)
+    """
+    try:
+        zoom = request.args.get('zoom', 6, type=int)
+        if zoom is None or not 0 <= zoom <= HEATMAP_MAX_ZOOM:
+            return jsonify({'error': f'zoom must be between 0 and {HEATMAP_MAX_ZOOM}'}), 400
+        window_arg = request.args.get('window', 'all')
+        try:
+            window = parse_window(window_arg)
+            bbox = parse_bbox(request.args.get('bbox'), zoom)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        severities = tuple(sorted({s for s in request.args.get('severity', '').split(',') if s}))
+        unknown = set(severities) - set(HEATMAP_SEVERITIES)
+        if unknown:
+            return jsonify({'error': f"Unknown severity: {', '.join(sorted(unknown))}"}), 400
+
+        key = (zoom, window_arg, severities, bbox)
+        version = collection_version('incidents')
+        now = time.monotonic()
+        cached = heatmap_cache.get(key)
+        # Sliding windows also age out, so entries expire even without writes
+        if cached and cached[0] == version and now - cached[1] < HEATMAP_CACHE_SECONDS:
+            return jsonify(cached[2]), 200
+        heatmap = compute_heatmap(zoom, window, severities, bbox)
+        heatmap.update({'window': window_arg, 'severity': list(severities)})
+        with heatmap_cache_lock:
+            if len(heatmap_cache) >= HEATMAP_CACHE_SIZE:
+                heatmap_cache.clear()
+            heatmap_cache[key] = (version, now, heatmap)
+        return jsonify(heatmap), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# ============= SEARCH ENDPOINT =============
+# Searchable collection names, keyed by the type tag returned with each hit
+SEARCH_COLLECTIONS = {
+    'alert': 'alerts',
+    'incident': 'incidents',
+    'message': 'messages'
+}
+# Collections that have no 'severity' field are skipped when filtering on it
+SEVERITY_TYPES = {'alert', 'incident'}
+MAX_SEARCH_PAGE_SIZE = 100
+# Each collection fetches page * pageSize hits, so deep pages are refused
+MAX_SEARCH_PAGE = 10
+
+@api.route('/api/search', methods=['GET'])
+def search():
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': 'Query parameter q is required'}), 400
+
+        page = max(request.args.get('page', 1, type=int), 1)
+        if page > MAX_SEARCH_PAGE:
+            return jsonify({'error': f'page must be at most {MAX_SEARCH_PAGE}; refine the query instead'}), 400
+        page_size = min(max(request.args.get('pageSize', 20, type=int), 1), MAX_SEARCH_PAGE_SIZE)
+        # The exact total costs a full $text count per collection, so it is opt-in
+        with_total = request.args.get('withTotal', '').lower() in ('1', 'true', 'yes')
+        status = request.args.get('status')
+        severity = request.args.get('severity')
+        types = request.args.get('types')
+        types = [t for t in types.split(',') if t in SEARCH_COLLECTIONS] if types else list(SEARCH_COLLECTIONS)
+
+        # Each collection only needs to return enough hits to fill the requested page
+        limit = page * page_size
+        hits = []
+        total = 0
+        for doc_type in types:
+            criteria = {'$text': {'$search': query}}
+            if status and status != 'all':
+                criteria['status'] = status
+            if severity and severity != 'all':
+                if doc_type not in SEVERITY_TYPES:
+                    continue
+                criteria['severity'] = severity
+
+            collection = reads()[SEARCH_COLLECTIONS[doc_type]]
+            if with_total:
+                total += collection.count_documents(criteria)
+            cursor = collection.find(
+                criteria, {'score': {'$meta': 'textScore'}}
+            ).sort([('score', {'$meta': 'textScore'})]).limit(limit)
+            for doc in cursor:
+                score = doc.pop('score', 0)
+                hits.append({'type': doc_type, 'score': round(score, 4), 'item': serialize_doc(doc)})
+
+        hits.sort(key=lambda hit: hit['score'], reverse=True)
+        start = (page - 1) * page_size
+        response = {
+            'query': query,
+            'page': page,
+            'pageSize': page_size,
+            'results': hits[start:start + page_size]
+        }
+        if with_total:
+            response['total'] = total
+        return jsonify(response), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# ============= BATCH ENDPOINT =============
+# Several API calls in one round trip. Each item is dispatched through the
+# normal request pipeline; runs of consecutive GETs execute concurrently,
+# other methods run one at a time in the order given.
+MAX_BATCH_REQUESTS = 25
+BATCH_METHODS = {'GET', 'POST', 'PUT', 'DELETE'}
+batch_executor = ThreadPoolExecutor(max_workers=int(os.getenv('BATCH_WORKERS', '8')),
+                                    thread_name_prefix='batch')
+
+def dispatch_subrequest(flask_app, item, remote_addr, headers=None):
+    """Run one sub-request and return {'id', 'status', 'body'}"""
+    kwargs = {
+        'method': item['method'],
+        'environ_base': {'REMOTE_ADDR': remote_addr},
+        'headers': headers or {}
+    }
+    if item.get('body') is not None:
+        kwargs['json'] = item['body']
+    with flask_app.test_request_context(item['path'], **kwargs):
+        try:
+            response = flask_app.full_dispatch_request()
+        except Exception as e:
+            return {'id': item.get('id'), 'status': 500, 'body': {'error': str(e)}}
+        body = response.get_json(silent=True)
+        if body is None and response.status_code != 204:
+            body = response.get_data(as_text=True)
+        return {'id': item.get('id'), 'status': response.status_code, 'body': body}
+
+def validate_subrequest(item):
+    if not isinstance(item, dict):
+        return 'each request must be an object'
+    method = str(item.get('method', 'GET')).upper()
+    path = item.get('path')
+    if method not in BATCH_METHODS:
+        return f'unsupported method {method}'
+    if not isinstance(path, str) or not path.startswith('/api/'):
+        return 'path must start with /api/'
+    if path.split('?')[0].rstrip('/') == '/api/batch':
+        return 'batch requests cannot be nested'
+    item['method'] = method
+    return None
+
+@api.route('/api/batch', methods=['POST'])
+def batch():
+    """
+    Body: {"requests": [{"id": "a", "method": "GET", "path": "/api/alerts"}, ...]}
+    Returns {"responses": [{"id", "status", "body"}, ...]} in request order.
+    """
+    try:
+        items = (request.get_json(silent=True) or {}).get('requests')
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'requests must be a non-empty list'}), 400
+        if len(items) > MAX_BATCH_REQUESTS:
+            return jsonify({'error': f'At most {MAX_BATCH_REQUESTS} requests per batch'}), 400
+
+        remote_addr = request.remote_addr
+        # Worker threads have no app context, so hand them the app itself
+        flask_app = current_app._get_current_object()
+        responses = [None] * len(items)
+        pending_reads = []
+        headers = {'X-Read-Preference': 'primary'} if primary_required() else {}
+
+        def flush_reads():
+            futures = [(index, batch_executor.submit(dispatch_subrequest, flask_app, items[index], remote_addr, headers))
+                       for index in pending_reads]
+            for index, future in futures:
+                responses[index] = future.result()
+            pending_reads.clear()
+
+        for index, item in enumerate(items):
+            error = validate_subrequest(item)
+            if error:
+                responses[index] = {'id': item.get('id') if isinstance(item, dict) else None,
+                                    'status': 400, 'body': {'error': error}}
+            elif item['method'] == 'GET':
+                pending_reads.append(index)
+            else:
+                # Writes act as barriers so earlier reads and later reads see them in order
+                flush_reads()
+                responses[index] = dispatch_subrequest(flask_app, item, remote_addr, headers)
+                # Reads after a write in the same batch must see it
+                headers = {'X-Read-Preference': 'primary'}
+        flush_reads()
+        return jsonify({'responses': responses}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # ============= USERS ENDPOINTS =============
-@app.route('/api/users', methods=['GET'])
+@api.route('/api/users', methods=['GET'])
 def get_users():
     try:
         users = list(users_collection.find())
@@ -650,10 +1954,92 @@ def get_users():
         return jsonify({'error': str(e)}), 500
 
 # Health check endpoint
-@app.route('/api/health', methods=['GET'])
+@api.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'ok', 'message': 'Server is running'}), 200
 
+# ============= STARTUP & READINESS =============
+# Importing this module does no network I/O. The first request a process
+# serves starts a background warm-up (Mongo connection, indexes, weather
+# session); /api/ready answers 503 until it has finished.
+warmup_state = {'pid': None, 'ready': False, 'error': None, 'warmUpMs': None, 'steps': {}}
+warmup_lock = threading.Lock()
+
+def warm_up():
+    started = time.perf_counter()
+    steps = {}
+
+    def timed(name, step):
+        step_started = time.perf_counter()
+        step()
+        steps[name] = round((time.perf_counter() - step_started) * 1000, 3)
+
+    try:
+        timed('mongoPingMs', lambda: db.command('ping'))
+        try:
+            timed('indexesMs', ensure_indexes)
+        except Exception as e:
+            print(f"Index creation skipped: {e}")
+            steps['indexesError'] = str(e)
+        timed('weatherSessionMs', weather_session)
+        warmup_state.update(ready=True, error=None, steps=steps,
+                            warmUpMs=round((time.perf_counter() - started) * 1000, 3))
+    except Exception as e:
+        warmup_state.update(ready=False, error=str(e), steps=steps)
+        # Let the next request try again
+        warmup_state['pid'] = None
+
+def start_warm_up():
+    with warmup_lock:
+        if warmup_state['pid'] == os.getpid():
+            return
+        warmup_state.update(pid=os.getpid(), ready=False, warmUpMs=None, steps={})
+    threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
+
+@api.before_app_request
+def ensure_warm_up():
+    if warmup_state['pid'] != os.getpid():
+        start_warm_up()
+
+# Readiness endpoint: 200 once this process's connections are warm
+@api.route('/api/ready', methods=['GET'])
+def readiness_check():
+    state = {key: value for key, value in warmup_state.items() if key != 'pid'}
+    state['pid'] = os.getpid()
+    state['mongoConnected'] = mongo.connected()
+    return jsonify(state), 200 if state['ready'] else 503
+
+# Metrics endpoint (Prometheus text format)
+@api.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    return current_app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# ============= ADMIN ENDPOINTS =============
+@api.route('/api/admin/slow-queries', methods=['GET'])
+def get_slow_queries():
+    collscan_only = request.args.get('collscan', '').lower() in ('1', 'true', 'yes')
+    return jsonify(slow_queries.snapshot(collscan_only=collscan_only)), 200
+
+@api.route('/api/admin/slow-queries', methods=['DELETE'])
+def clear_slow_queries():
+    slow_queries.clear()
+    return jsonify({'message': 'Slow query log cleared'}), 200
+
+@api.route('/api/admin/archive', methods=['POST'])
+def run_archival():
+    """Move expired documents to the archive collections now; ?dryRun=true only counts them"""
+    try:
+        dry_run = request.args.get('dryRun', '').lower() in ('1', 'true', 'yes')
+        collections = [name for name in request.args.get('collections', '').split(',') if name]
+        unknown = set(collections) - set(archival.POLICIES)
+        if unknown:
+            return jsonify({'error': f"Unknown collection: {', '.join(sorted(unknown))}"}), 400
+        results = archival.archive_expired(db, collections or None, dry_run=dry_run,
+                                           on_moved=mark_collection_changed)
+        return jsonify({'dryRun': dry_run, 'collections': results}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # ============= AUTH ENDPOINTS =============
 def validate_password_rules(password):
     """
@@ -684,7 +2070,7 @@ def validate_password_rules(password):
     return True
 
 
-@app.route('/api/auth/login', methods=['POST'])
+@api.route('/api/auth/login', methods=['POST'])
 def login():
     try:
         data = request.json
@@ -709,7 +2095,7 @@ def login():
                 'role': 'Operator',
                 'department': 'Emergency Services',
                 'contact': '+91-0000000000',
-                'lastActive': datetime.utcnow().isoformat() + 'Z'
+                'lastActive': datetime.utcnow()
             }
             result = users_collection.insert_one(user_data)
             user_data['id'] = str(result.inserted_id)
@@ -723,7 +2109,7 @@ def login():
         # Update last active
         users_collection.update_one(
             {'_id': user['_id']},
-            {'$set': {'lastActive': datetime.utcnow().isoformat() + 'Z'}}
+            {'$set': {'lastActive': datetime.utcnow()}}
         )
         
         user_data = serialize_doc(user)
@@ -734,5 +2120,19 @@ def login():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# ============= APP FACTORY =============
+def create_app():
+    """Build the Flask app. No network I/O happens here, so workers start in milliseconds"""
+    app = Flask(__name__)
+    CORS(app)  # Enable CORS for all routes
+    app.json = JSONProvider(app)
+    if TRUSTED_PROXY_COUNT > 0:
+        # remote_addr becomes the client address the trusted proxies forwarded
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_COUNT)
+    app.register_blueprint(api)
+    return app
+
+app = create_app()
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
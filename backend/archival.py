@@ -0,0 +1,134 @@
+"""
+Hot/cold archival: moves documents past their retention policy from the live
+collections into `<name>_archive`, in batches, keeping their _id.
+
+Each batch is copied with idempotent upserts and then deleted from the hot
+collection one document at a time under the same filter. A document that
+changed in between (e.g. an incident reopened) fails the filter and stays hot;
+one deleted in between is already gone. Either way it was not moved by us, so
+its archive copy is removed. An interrupted run leaves at most one batch in
+both places; the next run finishes it.
+
+Run from cron with `python archival.py`, or via POST /api/admin/archive.
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from pymongo import MongoClient, ReplaceOne
+
+from read_cache import bump_versions
+
+ARCHIVE_SUFFIX = '_archive'
+
+# collection -> (extra filter, date field the age is measured on, default age in days)
+POLICIES = {
+    'incidents': ({'status': 'resolved'}, 'updatedAt', 30),
+    'alerts': ({'status': 'resolved'}, 'updatedAt', 30),
+    'messages': ({}, 'timestamp', 90)
+}
+
+
+def archive_name(name):
+    return name + ARCHIVE_SUFFIX
+
+
+def policy_days():
+    """Age thresholds, overridable per collection with ARCHIVE_<NAME>_DAYS"""
+    return {
+        name: int(os.getenv(f'ARCHIVE_{name.upper()}_DAYS', str(days)))
+        for name, (_, _, days) in POLICIES.items()
+    }
+
+
+def expired_filter(name, days, now=None):
+    extra, date_field, _ = POLICIES[name]
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+    return dict(extra, **{date_field: {'$lt': cutoff}})
+
+
+def archive_collection(db, name, days, batch_size=1000, dry_run=False, now=None):
+    """Move expired documents of one collection; returns {'moved', 'keptHot', 'seconds'}"""
+    hot = db[name]
+    cold = db[archive_name(name)]
+    criteria = expired_filter(name, days, now)
+    started = time.perf_counter()
+    moved = 0
+    kept_hot = 0
+
+    if dry_run:
+        return {'moved': hot.count_documents(criteria), 'keptHot': 0, 'seconds': 0.0}
+
+    while True:
+        batch = list(hot.find(criteria).sort('_id', 1).limit(batch_size))
+        if not batch:
+            break
+        archived_at = datetime.utcnow()
+        cold.bulk_write([ReplaceOne({'_id': doc['_id']}, dict(doc, archivedAt=archived_at), upsert=True)
+                         for doc in batch], ordered=False)
+        # One delete per document, so we know exactly which ones this run moved
+        not_moved = [doc['_id'] for doc in batch
+                     if not hot.delete_one(dict(criteria, _id=doc['_id'])).deleted_count]
+        moved += len(batch) - len(not_moved)
+        if not_moved:
+            # Changed (still hot) or deleted since they were read; neither may appear archived
+            cold.delete_many({'_id': {'$in': not_moved}})
+            kept_hot += hot.count_documents({'_id': {'$in': not_moved}})
+            if len(not_moved) == len(batch):
+                break
+    return {'moved': moved, 'keptHot': kept_hot, 'seconds': round(time.perf_counter() - started, 3)}
+
+
+def archive_expired(db, collections=None, batch_size=1000, dry_run=False, now=None, on_moved=None):
+    """
+    Archive each collection's expired documents. Every collection that moved
+    documents gets one version bump, via `on_moved(name)` when given (the API
+    passes its own, so its caches see the change at once).
+    """
+    days = policy_days()
+    results = {}
+    for name in (collections or POLICIES):
+        results[name] = dict(archive_collection(db, name, days[name], batch_size, dry_run, now),
+                             olderThanDays=days[name])
+        if results[name]['moved'] and not dry_run:
+            if on_moved is not None:
+                on_moved(name)
+            else:
+                bump_versions(db, [name])
+    return results
+
+
+def ensure_archive_indexes(db):
+    """Archive lookups are by _id or by the policy's date field"""
+    for name, (_, date_field, _) in POLICIES.items():
+        db[archive_name(name)].create_index([(date_field, -1)])
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Move expired documents into archive collections.')
+    parser.add_argument('--collections', nargs='+', choices=sorted(POLICIES), default=sorted(POLICIES),
+                        help='Collections to archive (default: all)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Documents moved per batch')
+    parser.add_argument('--dry-run', action='store_true', help='Count what would move without writing')
+    return parser.parse_args()
+
+
+def main():
+    load_dotenv()
+    args = parse_args()
+    client = MongoClient(os.getenv('MONGO_URI', 'mongodb://localhost:27017/'))
+    db = client[os.getenv('MONGO_DB_NAME', 'disaster_management')]
+
+    ensure_archive_indexes(db)
+    results = archive_expired(db, args.collections, args.batch_size, args.dry_run)
+    for name, result in results.items():
+        verb = 'would move' if args.dry_run else 'moved'
+        print(f"✓ {name}: {verb} {result['moved']} documents older than {result['olderThanDays']} days "
+              f"to {archive_name(name)} ({result['seconds']}s)")
+    client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,745 @@
+"""
+Load-testing harness for the backend API.
+
+Runs the Flask app in-process against a local mongod (--mongo-uri), a
+throwaway three-member local replica set (--replica-set, requires mongod on
+PATH) or an in-memory Mongo stand-in (--in-memory, requires mongomock) and a
+local stub weather server, drives realistic traffic mixes and reports throughput and
+p50/p95/p99 latency per route. Everything runs offline on one machine.
+
+Examples:
+    python benchmark.py --in-memory --duration 10 --output baseline.json
+    python benchmark.py --mongo-uri mongodb://localhost:27017/ --mix dashboard,alert-burst
+    python benchmark.py --in-memory --compare baseline.json
+    python benchmark.py --replica-set --read-preference secondaryPreferred --mix dashboard
+"""
+import argparse
+import atexit
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DB_NAME = 'disaster_management_bench'
+BENCH_PASSWORD = 'BenchPass123!'
+
+# ============= STUB WEATHER SERVER =============
+class StubWeatherHandler(BaseHTTPRequestHandler):
+    """Serves canned OpenWeatherMap responses so weather calls stay offline"""
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path.endswith('/weather'):
+            now = int(time.time())
+            body = {
+                'name': 'Mumbai',
+                'coord': {'lat': 19.07, 'lon': 72.88},
+                'main': {'temp': 31.2, 'humidity': 74, 'temp_max': 33.0, 'temp_min': 27.5},
+                'wind': {'speed': 5.1},
+                'visibility': 6000,
+                'weather': [{'main': 'Rain'}],
+                'sys': {'sunrise': now - 6 * 3600, 'sunset': now + 6 * 3600},
+                'timezone': 19800
+            }
+        elif path.endswith('/forecast'):
+            body = {'list': [
+                {
+                    'dt_txt': f'2024-06-{10 + i // 8:02d} {(i % 8) * 3:02d}:00:00',
+                    'main': {'temp_max': 32.0, 'temp_min': 26.0},
+                    'weather': [{'main': 'Rain'}],
+                    'pop': 0.8
+                }
+                for i in range(24)
+            ]}
+        elif path.endswith('/air_pollution'):
+            body = {'list': [{'main': {'aqi': 3}, 'components': {'pm2_5': 61.0, 'pm10': 118.0}}]}
+        else:
+            self.send_error(404)
+            return
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_weather_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubWeatherHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# ============= APP UNDER TEST =============
+def load_app(args, weather_port):
+    """Import the app configured for an isolated benchmark database"""
+    os.environ['MONGO_DB_NAME'] = BENCH_DB_NAME
+    os.environ['OPENWEATHER_API_KEY'] = 'benchmark'
+    os.environ['OPENWEATHER_BASE_URL'] = f'http://127.0.0.1:{weather_port}'
+    # All load comes from one client address, so per-client rate limits would cap every mix
+    for priority in ('CRITICAL', 'NORMAL', 'LOW'):
+        os.environ.setdefault(f'RATE_LIMIT_{priority}_RPS', '0')
+    if args.mongo_uri:
+        os.environ['MONGO_URI'] = args.mongo_uri
+
+    if args.in_memory:
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit('--in-memory requires mongomock (pip install mongomock)')
+        import pymongo
+        pymongo.MongoClient = mongomock.MongoClient
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+    return app_module
+
+def seed_benchmark_data(app_module, docs):
+    """Reset the benchmark database and insert a working set of documents"""
+    db = app_module.db
+    for name in ('alerts', 'resources', 'incidents', 'teams', 'evacuation_plans', 'messages', 'users'):
+        db[name].delete_many({})
+
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    severities = ['critical', 'high', 'medium', 'low']
+    cities = ['Mumbai', 'Delhi', 'Chennai', 'Kolkata', 'Pune', 'Jaipur']
+
+    db.alerts.insert_many([{
+        'title': f'Flood warning {i}', 'severity': rng.choice(severities), 'type': 'natural',
+        'location': rng.choice(cities), 'description': 'Heavy rainfall expected in low-lying areas.',
+        'status': rng.choice(['active', 'monitoring', 'resolved']), 'createdAt': now, 'updatedAt': now
+    } for i in range(docs)])
+    db.incidents.insert_many([{
+        'title': f'Incident {i}', 'type': 'Natural Disaster', 'severity': rng.choice(severities),
+        'location': rng.choice(cities),
+        'coordinates': {'lat': round(rng.uniform(8, 34), 4), 'lng': round(rng.uniform(68, 92), 4)},
+        'description': 'Waterlogging reported on arterial roads.', 'reportedBy': 'Control Room',
+        'status': rng.choice(['reported', 'investigating', 'responding', 'resolved']),
+        'createdAt': now, 'updatedAt': now
+    } for i in range(docs)])
+    db.resources.insert_many([{
+        'name': f'Resource {i}', 'type': rng.choice(['personnel', 'equipment', 'supplies', 'vehicle']),
+        'quantity': 100, 'available': 100, 'location': rng.choice(cities), 'status': 'available'
+    } for i in range(max(docs // 10, 1))])
+    db.teams.insert_many([{
+        'name': f'Team {i}', 'type': 'rescue', 'leader': f'Leader {i}', 'members': [], 'status': 'available',
+        'location': rng.choice(cities), 'equipment': [], 'contact': '+91-0000000000'
+    } for i in range(max(docs // 10, 1))])
+    db.messages.insert_many([{
+        'from': 'Control Room', 'to': f'Team {i % 10}', 'subject': f'Update {i}',
+        'content': 'Confirm current status and location.', 'priority': 'normal', 'status': 'sent',
+        'timestamp': now
+    } for i in range(docs)])
+    db.users.insert_many([{
+        'username': f'operator{i}', 'password': BENCH_PASSWORD, 'name': f'Operator {i}', 'role': 'Operator',
+        'department': 'Emergency Services', 'contact': '+91-0000000000', 'lastActive': now
+    } for i in range(50)])
+
+def start_app_server(app_module):
+    from werkzeug.serving import make_server
+    # Per-request access logging would dominate the measurements
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# ============= REPLICA SET =============
+REPLICA_SET_NAME = 'benchrs'
+REPLICA_SET_MEMBERS = 3
+
+def member_client(host):
+    import pymongo
+    return pymongo.MongoClient(f'mongodb://{host}/?directConnection=true', serverSelectionTimeoutMS=1000)
+
+def wait_until(check, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if check():
+                return
+        except Exception:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError('replica set did not come up in time')
+
+def member_states(host):
+    client = member_client(host)
+    try:
+        return sorted(member['stateStr'] for member in client.admin.command('replSetGetStatus')['members'])
+    finally:
+        client.close()
+
+def ping(host):
+    client = member_client(host)
+    try:
+        return client.admin.command('ping')
+    finally:
+        client.close()
+
+def start_replica_set(mongod, base_port):
+    """Start a local replica set with one primary and two secondaries, each in a temporary dbpath"""
+    if shutil.which(mongod) is None:
+        sys.exit(f'--replica-set needs the {mongod} binary on PATH (or pass --mongod)')
+    data_dir = tempfile.mkdtemp(prefix='bench-rs-')
+    hosts = [f'127.0.0.1:{base_port + i}' for i in range(REPLICA_SET_MEMBERS)]
+    replica_set = {
+        'uri': f"mongodb://{','.join(hosts)}/?replicaSet={REPLICA_SET_NAME}",
+        'hosts': hosts,
+        'processes': [],
+        'dataDir': data_dir
+    }
+    atexit.register(stop_replica_set, replica_set)
+    for i, host in enumerate(hosts):
+        dbpath = os.path.join(data_dir, f'member{i}')
+        os.makedirs(dbpath)
+        replica_set['processes'].append(subprocess.Popen(
+            [mongod, '--replSet', REPLICA_SET_NAME, '--port', str(base_port + i), '--bind_ip', '127.0.0.1',
+             '--dbpath', dbpath, '--logpath', os.path.join(dbpath, 'mongod.log')],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        ))
+    for host in hosts:
+        wait_until(lambda: ping(host))
+    client = member_client(hosts[0])
+    try:
+        client.admin.command('replSetInitiate', {
+            '_id': REPLICA_SET_NAME,
+            'members': [{'_id': i, 'host': host} for i, host in enumerate(hosts)]
+        })
+    finally:
+        client.close()
+    wait_until(lambda: member_states(hosts[0]) == ['PRIMARY'] + ['SECONDARY'] * (REPLICA_SET_MEMBERS - 1))
+    return replica_set
+
+def stop_replica_set(replica_set):
+    for process in replica_set['processes']:
+        if process.poll() is None:
+            process.terminate()
+    for process in replica_set['processes']:
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    replica_set['processes'] = []
+    shutil.rmtree(replica_set['dataDir'], ignore_errors=True)
+
+def member_opcounters(hosts):
+    """Client-issued operations per member; replicated writes are counted separately by mongod and excluded"""
+    counters = {}
+    for host in hosts:
+        client = member_client(host)
+        try:
+            status = client.admin.command('serverStatus')
+        finally:
+            client.close()
+        ops = status['opcounters']
+        counters[host] = {
+            'state': 'PRIMARY' if status['repl'].get('isWritablePrimary', status['repl'].get('ismaster')) else 'SECONDARY',
+            'reads': ops['query'],
+            'writes': ops['insert'] + ops['update'] + ops['delete']
+        }
+    return counters
+
+def check_read_routing(before, after, read_preference):
+    """
+    Compare member counters taken around the traffic mixes: writes must all
+    land on the primary, and finds must reach the secondaries unless the
+    configured read preference is 'primary'.
+    """
+    members = {
+        host: {
+            'state': after[host]['state'],
+            'reads': after[host]['reads'] - before[host]['reads'],
+            'writes': after[host]['writes'] - before[host]['writes']
+        }
+        for host in after
+    }
+    secondaries = [member for member in members.values() if member['state'] == 'SECONDARY']
+    secondary_reads = sum(member['reads'] for member in secondaries)
+    total_reads = sum(member['reads'] for member in members.values())
+    secondary_writes = sum(member['writes'] for member in secondaries)
+    expects_secondary_reads = read_preference != 'primary'
+    return {
+        'readPreference': read_preference,
+        'members': members,
+        'secondaryReadShare': round(secondary_reads / total_reads, 4) if total_reads else 0.0,
+        'secondaryWrites': secondary_writes,
+        'routedAsExpected': secondary_writes == 0 and (secondary_reads > 0) == expects_secondary_reads
+    }
+
+def check_read_your_writes(port, attempts=20):
+    """Create alerts and immediately list them with X-Read-Preference: primary; every one must be there"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    missing = 0
+    try:
+        for i in range(attempts):
+            conn.request('POST', '/api/alerts', body=json.dumps({
+                'title': f'Read-your-writes probe {i}', 'type': 'other', 'severity': 'low',
+                'location': 'Benchmark', 'status': 'active'
+            }), headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            created = json.loads(response.read())
+            conn.request('GET', '/api/alerts', headers={'X-Read-Preference': 'primary'})
+            response = conn.getresponse()
+            listed = {alert['id'] for alert in json.loads(response.read())}
+            if created.get('id') not in listed:
+                missing += 1
+    finally:
+        conn.close()
+    return {'attempts': attempts, 'missing': missing}
+
+# ============= TRAFFIC MIXES =============
+# Each mix is a weighted list of (route label, request factory). A factory
+# takes a per-thread RNG and returns (method, path, JSON body or None).
+def _dashboard_polling():
+    return [
+        (4, 'GET /api/alerts', lambda rng: ('GET', '/api/alerts', None)),
+        (3, 'GET /api/incidents', lambda rng: ('GET', '/api/incidents', None)),
+        (2, 'GET /api/resources', lambda rng: ('GET', '/api/resources', None)),
+        (3, 'GET /api/analytics', lambda rng: ('GET', '/api/analytics', None)),
+        (2, 'GET /api/weather/<location>', lambda rng: ('GET', '/api/weather/Mumbai', None))
+    ]
+
+def _alert_burst():
+    def create_alert(rng):
+        return ('POST', '/api/alerts', {
+            'title': f'Cyclone warning {rng.randrange(10 ** 6)}', 'severity': 'critical', 'type': 'natural',
+            'location': 'Gujarat Coast', 'description': 'Severe cyclonic storm approaching.', 'status': 'active'
+        })
+    return [
+        (6, 'POST /api/alerts', create_alert),
+        (4, 'GET /api/alerts', lambda rng: ('GET', '/api/alerts', None))
+    ]
+
+def _alert_ingest():
+    def ingest_alert(rng):
+        # A few hundred distinct alerts repeated by many sensors, so dedup is exercised too
+        return ('POST', '/api/alerts/ingest', {
+            'title': f'Storm surge sensor {rng.randrange(500)}', 'severity': 'high', 'type': 'natural',
+            'location': 'Odisha Coast', 'description': 'Water level above danger mark.', 'status': 'active'
+        })
+    return [
+        (9, 'POST /api/alerts/ingest', ingest_alert),
+        (1, 'GET /api/alerts', lambda rng: ('GET', '/api/alerts', None))
+    ]
+
+def _message_flood():
+    def create_message(rng):
+        return ('POST', '/api/messages', {
+            'from': 'Emergency Command', 'to': f'Team {rng.randrange(10)}', 'subject': 'Deployment order',
+            'content': 'Proceed to the assigned sector with full rescue gear.',
+            'priority': rng.choice(['urgent', 'high', 'normal']), 'status': 'sent'
+        })
+    return [
+        (8, 'POST /api/messages', create_message),
+        (2, 'GET /api/messages', lambda rng: ('GET', '/api/messages', None))
+    ]
+
+def _login_storm():
+    def login(rng):
+        return ('POST', '/api/auth/login', {'username': f'operator{rng.randrange(50)}', 'password': BENCH_PASSWORD})
+    return [(1, 'POST /api/auth/login', login)]
+
+def _disaster_spike():
+    # Run with --concurrency above SHED_MAX_IN_FLIGHT: the reads should be shed (503) before the writes
+    def create_alert(rng):
+        return ('POST', '/api/alerts', {
+            'title': f'Flash flood {rng.randrange(10 ** 6)}', 'severity': 'critical', 'type': 'natural',
+            'location': 'Assam', 'description': 'River breached embankment.', 'status': 'active'
+        })
+
+    def report_incident(rng):
+        return ('POST', '/api/incidents', {
+            'title': f'Building collapse {rng.randrange(10 ** 6)}', 'severity': 'critical', 'type': 'Accident',
+            'location': 'Guwahati', 'description': 'Residents trapped.', 'status': 'active'
+        })
+
+    def urgent_message(rng):
+        return ('POST', '/api/messages', {
+            'from': 'Emergency Command', 'to': f'Team {rng.randrange(10)}', 'subject': 'Evacuate now',
+            'content': 'Move all residents to the nearest shelter.', 'priority': 'urgent', 'status': 'sent'
+        })
+    return [
+        (2, 'POST /api/alerts', create_alert),
+        (1, 'POST /api/incidents', report_incident),
+        (1, 'POST /api/messages', urgent_message),
+        (3, 'GET /api/incidents', lambda rng: ('GET', '/api/incidents', None)),
+        (2, 'GET /api/analytics', lambda rng: ('GET', '/api/analytics', None)),
+        (2, 'GET /api/weather/<location>', lambda rng: ('GET', '/api/weather/Guwahati', None))
+    ]
+
+MIXES = {
+    'dashboard': _dashboard_polling,
+    'alert-burst': _alert_burst,
+    'alert-ingest': _alert_ingest,
+    'message-flood': _message_flood,
+    'login-storm': _login_storm,
+    'disaster-spike': _disaster_spike
+}
+
+def run_mix(port, mix, concurrency, duration, accept_encoding=None):
+    """Drive one traffic mix for `duration` seconds and return latencies per route"""
+    weighted = [entry for entry in mix() for _ in range(entry[0])]
+    latencies = {}
+    errors = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(seed):
+        rng = random.Random(seed)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local_latencies = {}
+        local_errors = {}
+        while time.perf_counter() < deadline:
+            _, label, factory = rng.choice(weighted)
+            method, path, body = factory(rng)
+            payload = json.dumps(body).encode() if body is not None else None
+            headers = {'Content-Type': 'application/json'} if payload else {}
+            if accept_encoding:
+                headers['Accept-Encoding'] = accept_encoding
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                failed = response.status >= 500
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                failed = True
+            elapsed = time.perf_counter() - start
+            local_latencies.setdefault(label, []).append(elapsed)
+            if failed:
+                local_errors[label] = local_errors.get(label, 0) + 1
+        conn.close()
+        with lock:
+            for label, values in local_latencies.items():
+                latencies.setdefault(label, []).extend(values)
+            for label, count in local_errors.items():
+                errors[label] = errors.get(label, 0) + count
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - started
+
+# ============= RESERVATION CONTENTION CHECK =============
+# Runs after the mixes on every benchmark run, so oversubscription is caught routinely
+RESERVATION_CHECK_MIN_CONCURRENCY = 16
+RESERVATION_CHECK_MAX_SECONDS = 5.0
+
+def run_reservation_check(port, app_module, concurrency, duration, resources=3, quantity=50):
+    """
+    Hammer a few hot resources with concurrent reserve/release calls, then
+    verify that each resource's 'available' equals its starting value minus
+    the net units the server acknowledged. Any difference is a lost update.
+    """
+    collection = app_module.resources_collection
+    ids = [
+        str(collection.insert_one({
+            'name': f'Contended resource {i}', 'type': 'equipment', 'quantity': quantity,
+            'available': quantity, 'location': 'Benchmark', 'status': 'available'
+        }).inserted_id)
+        for i in range(resources)
+    ]
+    taken = {resource_id: 0 for resource_id in ids}
+    counts = {'succeeded': 0, 'conflicts': 0, 'errors': 0}
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(seed):
+        rng = random.Random(seed)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local_taken = {resource_id: 0 for resource_id in ids}
+        local_counts = {'succeeded': 0, 'conflicts': 0, 'errors': 0}
+        local_latencies = []
+        while time.perf_counter() < deadline:
+            resource_id = rng.choice(ids)
+            action = 'reserve' if rng.random() < 0.6 else 'release'
+            units = rng.randint(1, 3)
+            start = time.perf_counter()
+            conn.request('POST', f'/api/resources/{resource_id}/{action}',
+                         body=json.dumps({'quantity': units}), headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            local_latencies.append(time.perf_counter() - start)
+            if response.status == 200:
+                local_taken[resource_id] += units if action == 'reserve' else -units
+                local_counts['succeeded'] += 1
+            elif response.status == 409:
+                local_counts['conflicts'] += 1
+            else:
+                local_counts['errors'] += 1
+        conn.close()
+        with lock:
+            for resource_id, units in local_taken.items():
+                taken[resource_id] += units
+            for key, value in local_counts.items():
+                counts[key] += value
+            latencies.extend(local_latencies)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    lost_updates = 0
+    out_of_bounds = 0
+    for resource_id in ids:
+        doc = collection.find_one({'_id': app_module.ObjectId(resource_id)})
+        lost_updates += abs((quantity - taken[resource_id]) - doc['available'])
+        if not 0 <= doc['available'] <= doc['quantity']:
+            out_of_bounds += 1
+        collection.delete_one({'_id': doc['_id']})
+
+    latencies.sort()
+    operations = len(latencies)
+    return dict(counts, **{
+        'operations': operations,
+        'throughput': round(operations / elapsed, 1),
+        'p50Ms': round(percentile(latencies, 50) * 1000, 3),
+        'p99Ms': round(percentile(latencies, 99) * 1000, 3),
+        'lostUpdates': lost_updates,
+        'outOfBounds': out_of_bounds,
+        'consistent': lost_updates == 0 and out_of_bounds == 0 and counts['errors'] == 0
+    })
+
+# ============= INSTRUMENTATION OVERHEAD =============
+def measure_instrumentation_overhead(app_module, iterations=100000):
+    """Per-request cost of the metrics hooks, measured outside any network I/O"""
+    app = app_module.app
+    response = app.response_class(b'[]', mimetype='application/json')
+    with app.test_request_context('/api/alerts', method='GET'):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            app_module.start_request_timer()
+            app_module.record_request_metrics(response)
+        hooks = (time.perf_counter() - started) / iterations
+
+    listener = app_module.MongoCommandMetrics()
+    event = type('Event', (), {'duration_micros': 850, 'command_name': 'find'})()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        listener.succeeded(event)
+    mongo = (time.perf_counter() - started) / iterations
+
+    return {'requestHooksMicros': round(hooks * 1e6, 3), 'mongoListenerMicros': round(mongo * 1e6, 3)}
+
+# ============= STARTUP TIME =============
+# Runs in a fresh interpreter so nothing is already imported or connected
+STARTUP_PROBE = """
+import json, sys, time
+if sys.argv[1] == 'in-memory':
+    import mongomock, pymongo
+    pymongo.MongoClient = mongomock.MongoClient
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app()
+created = time.perf_counter()
+client = flask_app.test_client()
+while client.get('/api/ready').status_code != 200 and time.perf_counter() - created < 30:
+    time.sleep(0.001)
+ready = time.perf_counter()
+print(json.dumps({
+    'importMs': round((imported - started) * 1000, 3),
+    'createAppMs': round((created - imported) * 1000, 3),
+    'readyMs': round((ready - created) * 1000, 3),
+    'ready': client.get('/api/ready').status_code == 200
+}))
+"""
+
+def measure_startup(args):
+    """Cold import, create_app() and time until /api/ready, in a new process"""
+    output = subprocess.run(
+        [sys.executable, '-c', STARTUP_PROBE, 'in-memory' if args.in_memory else 'mongod'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=os.environ,
+        capture_output=True, text=True, timeout=120
+    )
+    lines = output.stdout.strip().splitlines()
+    if output.returncode != 0 or not lines:
+        return {'error': output.stderr.strip().splitlines()[-1] if output.stderr.strip() else 'no output'}
+    return json.loads(lines[-1])
+
+# ============= REPORTING =============
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100.0 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+def summarize(latencies, errors, elapsed):
+    routes = {}
+    for label, values in sorted(latencies.items()):
+        values.sort()
+        routes[label] = {
+            'requests': len(values),
+            'errors': errors.get(label, 0),
+            'throughput': round(len(values) / elapsed, 1),
+            'p50Ms': round(percentile(values, 50) * 1000, 3),
+            'p95Ms': round(percentile(values, 95) * 1000, 3),
+            'p99Ms': round(percentile(values, 99) * 1000, 3)
+        }
+    total = sum(route['requests'] for route in routes.values())
+    return {'elapsedSeconds': round(elapsed, 3), 'throughput': round(total / elapsed, 1), 'routes': routes}
+
+def print_report(results):
+    for mix_name, summary in results['mixes'].items():
+        print(f"\n== {mix_name}: {summary['throughput']} req/s over {summary['elapsedSeconds']}s")
+        print(f"  {'route':<32} {'reqs':>7} {'err':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for label, route in summary['routes'].items():
+            print(f"  {label:<32} {route['requests']:>7} {route['errors']:>5} {route['throughput']:>8} "
+                  f"{route['p50Ms']:>9} {route['p95Ms']:>9} {route['p99Ms']:>9}")
+
+def print_comparison(results, baseline):
+    """Print per-route throughput and p95/p99 changes against a saved baseline"""
+    print(f"\n== Comparison against baseline from {baseline.get('timestamp', 'unknown')}")
+    for mix_name, summary in results['mixes'].items():
+        old_mix = baseline.get('mixes', {}).get(mix_name)
+        if not old_mix:
+            continue
+        for label, route in summary['routes'].items():
+            old = old_mix['routes'].get(label)
+            if not old:
+                continue
+            deltas = []
+            for key in ('throughput', 'p95Ms', 'p99Ms'):
+                change = (route[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+                deltas.append(f"{key} {old[key]} -> {route[key]} ({change:+.1f}%)")
+            print(f"  {mix_name:<14} {label:<32} " + ', '.join(deltas))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the disaster management backend API')
+    backend = parser.add_mutually_exclusive_group(required=True)
+    backend.add_argument('--mongo-uri', help='Local mongod to benchmark against (uses a separate database)')
+    backend.add_argument('--in-memory', action='store_true', help='Use the in-memory mongomock stand-in')
+    backend.add_argument('--replica-set', action='store_true',
+                         help='Start a local three-member replica set and check where reads are routed')
+    parser.add_argument('--mongod', default='mongod', help='mongod binary used by --replica-set')
+    parser.add_argument('--replica-set-port', type=int, default=27117,
+                        help='First of the consecutive ports used by --replica-set members')
+    parser.add_argument('--read-preference', default='secondaryPreferred',
+                        help='MONGO_READ_PREFERENCE for the app under --replica-set')
+    parser.add_argument('--mix', default=','.join(MIXES), help=f"Comma-separated mixes: {', '.join(MIXES)}")
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per mix')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent client connections')
+    parser.add_argument('--docs', type=int, default=500, help='Documents seeded per large collection')
+    parser.add_argument('--skip-reservation-check', action='store_true',
+                        help='Skip the reserve/release contention check that otherwise runs after the mixes '
+                             'and fails the run on lost or out-of-bounds updates')
+    parser.add_argument('--accept-encoding', help="Accept-Encoding sent with every request (e.g. 'gzip, br')")
+    parser.add_argument('--output', help='Write results as a JSON baseline to this file')
+    parser.add_argument('--compare', help='Compare results against a saved JSON baseline')
+    args = parser.parse_args()
+
+    mixes = [name.strip() for name in args.mix.split(',') if name.strip()]
+    unknown = [name for name in mixes if name not in MIXES]
+    if unknown:
+        parser.error(f"unknown mix: {', '.join(unknown)}")
+
+    replica_set = None
+    if args.replica_set:
+        replica_set = start_replica_set(args.mongod, args.replica_set_port)
+        args.mongo_uri = replica_set['uri']
+        os.environ['MONGO_READ_PREFERENCE'] = args.read_preference
+
+    weather_server = start_stub_weather_server()
+    app_module = load_app(args, weather_server.server_address[1])
+    seed_benchmark_data(app_module, args.docs)
+    app_server = start_app_server(app_module)
+    port = app_server.server_port
+
+    results = {
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'backend': 'mongomock' if args.in_memory else 'replica-set' if args.replica_set else 'mongod',
+            'concurrency': args.concurrency,
+            'durationSeconds': args.duration,
+            'docs': args.docs,
+            'acceptEncoding': args.accept_encoding
+        },
+        'mixes': {}
+    }
+    try:
+        counters = member_opcounters(replica_set['hosts']) if replica_set else None
+        for name in mixes:
+            latencies, errors, elapsed = run_mix(port, MIXES[name], args.concurrency, args.duration,
+                                                  args.accept_encoding)
+            results['mixes'][name] = summarize(latencies, errors, elapsed)
+        if replica_set:
+            results['replicaSet'] = check_read_routing(
+                counters, member_opcounters(replica_set['hosts']), args.read_preference)
+            results['replicaSet']['readYourWrites'] = check_read_your_writes(port)
+        if not args.skip_reservation_check:
+            results['reservationCheck'] = run_reservation_check(
+                port, app_module, max(args.concurrency, RESERVATION_CHECK_MIN_CONCURRENCY),
+                min(args.duration, RESERVATION_CHECK_MAX_SECONDS))
+    finally:
+        app_server.shutdown()
+        weather_server.shutdown()
+
+    results['instrumentation'] = measure_instrumentation_overhead(app_module)
+    results['startup'] = measure_startup(args)
+
+    print_report(results)
+    overhead = results['instrumentation']
+    print(f"\nInstrumentation overhead: {overhead['requestHooksMicros']} µs per request, "
+          f"{overhead['mongoListenerMicros']} µs per Mongo command")
+    startup = results['startup']
+    if 'error' in startup:
+        print(f"Startup: measurement failed ({startup['error']})")
+    else:
+        print(f"Startup: import {startup['importMs']} ms, create_app {startup['createAppMs']} ms, "
+              f"ready after {startup['readyMs']} ms{'' if startup['ready'] else ' (not ready)'}")
+    routing = results.get('replicaSet')
+    if routing:
+        print(f"\nReplica set ({routing['readPreference']}): {routing['secondaryReadShare'] * 100:.1f}% of finds "
+              f"served by secondaries, {routing['secondaryWrites']} writes on secondaries, "
+              f"{routing['readYourWrites']['missing']}/{routing['readYourWrites']['attempts']} own writes "
+              f"missing from primary reads -> "
+              f"{'OK' if routing['routedAsExpected'] and not routing['readYourWrites']['missing'] else 'FAILED'}")
+        for host, member in routing['members'].items():
+            print(f"  {host:<18} {member['state']:<10} {member['reads']:>8} finds {member['writes']:>8} writes")
+    check = results.get('reservationCheck')
+    if check:
+        print(f"\nReservation contention: {check['operations']} ops at {check['throughput']} ops/s "
+              f"(p50 {check['p50Ms']} ms, p99 {check['p99Ms']} ms), {check['succeeded']} succeeded, "
+              f"{check['conflicts']} conflicts, {check['lostUpdates']} lost updates, "
+              f"{check['outOfBounds']} out of bounds -> {'OK' if check['consistent'] else 'FAILED'}")
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, json.load(f))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.output}")
+    if check and not check['consistent']:
+        sys.exit(1)
+    if routing and (not routing['routedAsExpected'] or routing['readYourWrites']['missing']):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
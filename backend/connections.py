@@ -0,0 +1,137 @@
+"""
+Per-process, lazily created MongoDB client.
+
+Constructing a MongoClient starts monitor threads and opens sockets, which must
+not be shared across a fork. `MongoConnection` creates the client on first use
+in each process (a forked worker gets a fresh one), and the proxies below let
+module-level names such as `alerts_collection` stay in place without touching
+the network at import time.
+
+A connection may carry a read preference (e.g. secondaryPreferred). Only
+collections obtained through `database(reads=True)` use it; everything else
+stays on the primary.
+"""
+import os
+import threading
+
+import pymongo
+from pymongo import read_preferences
+
+READ_PREFERENCES = {
+    'primary': read_preferences.Primary,
+    'primaryPreferred': read_preferences.PrimaryPreferred,
+    'secondary': read_preferences.Secondary,
+    'secondaryPreferred': read_preferences.SecondaryPreferred,
+    'nearest': read_preferences.Nearest
+}
+# Smallest maxStalenessSeconds servers accept; pymongo only checks it at the first secondary read
+SMALLEST_MAX_STALENESS = 90
+
+
+def read_preference(mode, max_staleness=-1):
+    """'secondaryPreferred' and a staleness bound in seconds (-1 for none) -> pymongo read preference"""
+    if mode not in READ_PREFERENCES:
+        raise ValueError(f"Unknown read preference {mode!r}; expected one of {', '.join(READ_PREFERENCES)}")
+    try:
+        max_staleness = int(max_staleness)
+    except (TypeError, ValueError):
+        raise ValueError(f"MONGO_MAX_STALENESS_SECONDS must be an integer, got {max_staleness!r}")
+    if max_staleness != -1 and max_staleness < SMALLEST_MAX_STALENESS:
+        raise ValueError(f"MONGO_MAX_STALENESS_SECONDS must be -1 (no bound) or at least "
+                         f"{SMALLEST_MAX_STALENESS}, got {max_staleness}")
+    if mode == 'primary' and max_staleness != -1:
+        raise ValueError("MONGO_MAX_STALENESS_SECONDS only applies to secondary reads; "
+                         "set MONGO_READ_PREFERENCE too, or leave it at -1")
+    if mode == 'primary':
+        return read_preferences.Primary()
+    return READ_PREFERENCES[mode](max_staleness=max_staleness)
+
+
+class MongoConnection:
+    def __init__(self, uri, db_name, on_connect=None, read_preference=None, **client_kwargs):
+        self.uri = uri
+        self.db_name = db_name
+        # on_connect(client) runs once per process right after the client is created
+        self.on_connect = on_connect
+        # Applied to collections of database(reads=True) only
+        self.read_preference = read_preference
+        self.client_kwargs = client_kwargs
+        self._client = None
+        self._pid = None
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def client(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # Looked up at call time so a patched pymongo.MongoClient (benchmark --in-memory) is honoured
+                    client = pymongo.MongoClient(self.uri, **self.client_kwargs)
+                    self._collections = {}
+                    self._client = client
+                    self._pid = os.getpid()
+                    if self.on_connect is not None:
+                        self.on_connect(client)
+        return self._client
+
+    def connected(self):
+        """Whether this process has created its client yet"""
+        return self._pid == os.getpid()
+
+    def real_database(self):
+        return self.client()[self.db_name]
+
+    def real_collection(self, name, reads=False):
+        self.client()
+        reads = reads and self.read_preference is not None
+        collection = self._collections.get((name, reads))
+        if collection is None:
+            collection = self._client[self.db_name][name]
+            if reads:
+                collection = collection.with_options(read_preference=self.read_preference)
+            self._collections[(name, reads)] = collection
+        return collection
+
+    def database(self, reads=False):
+        """Lazy database; with reads=True its collections use the configured read preference"""
+        return LazyDatabase(self, reads)
+
+
+class LazyDatabase:
+    """Stands in for a pymongo Database; collections are resolved on use"""
+
+    __slots__ = ('_connection', '_reads')
+
+    def __init__(self, connection, reads=False):
+        self._connection = connection
+        self._reads = reads
+
+    def __getitem__(self, name):
+        return LazyCollection(self._connection, name, self._reads)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        attribute = getattr(self._connection.real_database(), name)
+        # db.alerts -> lazy collection; db.command(...) and friends pass through
+        if isinstance(attribute, pymongo.collection.Collection):
+            return LazyCollection(self._connection, name, self._reads)
+        return attribute
+
+
+class LazyCollection:
+    """Stands in for a pymongo Collection of the current process's client"""
+
+    __slots__ = ('_connection', '_name', '_reads')
+
+    def __init__(self, connection, name, reads=False):
+        self._connection = connection
+        self._name = name
+        self._reads = reads
+
+    @property
+    def name(self):
+        return self._name
+
+    def __getattr__(self, attribute):
+        return getattr(self._connection.real_collection(self._name, self._reads), attribute)
@@ -0,0 +1,21 @@
+"""
+Timestamp helpers shared by the API and the date migration.
+
+Timestamps are stored as native BSON dates (naive UTC datetimes) and leave the
+API as ISO strings ('2024-01-15T10:30:00.123000Z').
+"""
+from datetime import datetime, timezone
+
+
+def to_iso(value):
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat() + 'Z'
+
+
+def parse_iso(value):
+    """'2024-01-15T10:30:00Z' (any fraction or offset) -> naive UTC datetime"""
+    parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
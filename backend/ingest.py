@@ -0,0 +1,169 @@
+"""
+Group-commit ingestion queue for high-rate alert producers.
+
+Accepted documents get their _id up front and go into a bounded queue. A
+writer thread drains it with one unordered insert_many per batch, flushing when
+`batch_size` documents are waiting or `flush_interval` seconds after the first
+one arrived, whichever comes first. A full queue is reported to the caller
+(HTTP 429) instead of growing without bound, and repeats of the same
+title/location/type within `dedup_window` seconds are collapsed onto the first.
+
+Queue and writer thread are per process: a worker forked after import starts
+with an empty queue of its own, so documents queued in the parent are never
+written twice.
+"""
+import os
+import queue
+import threading
+import time
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+ACCEPTED = 'accepted'
+DUPLICATE = 'duplicate'
+REJECTED = 'rejected'
+DUPLICATE_KEY_ERROR = 11000
+
+_fork_lock = threading.Lock()
+
+
+def dedup_key(doc, fields):
+    return tuple(str(doc.get(field, '')).strip().lower() for field in fields)
+
+
+class GroupCommitWriter:
+    def __init__(self, collection, max_queue=10000, batch_size=500, flush_interval=0.05,
+                 dedup_window=300, dedup_fields=('title', 'location', 'type'), retries=3,
+                 on_flush=None, on_outcome=None):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dedup_window = dedup_window
+        self.dedup_fields = dedup_fields
+        self.retries = retries
+        # on_flush(inserted count, seconds, batch size) runs on the writer thread after each flush
+        self.on_flush = on_flush
+        # on_outcome(outcome) runs for every submitted document
+        self.on_outcome = on_outcome
+        self.flushed = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        # dedup key -> (_id, monotonic time first seen)
+        self._recent = {}
+        self._last_pruned = time.monotonic()
+        self._worker = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def submit(self, doc):
+        """Queue one document; returns (outcome, _id)"""
+        now = time.monotonic()
+        key = dedup_key(doc, self.dedup_fields)
+        self._check_process()
+        with self._lock:
+            self._start_worker()
+            if now - self._last_pruned > self.dedup_window:
+                self._prune(now)
+            seen = self._recent.get(key)
+            if seen is not None and now - seen[1] < self.dedup_window:
+                return self._outcome(DUPLICATE, seen[0])
+            doc['_id'] = doc.get('_id') or ObjectId()
+            try:
+                self._queue.put_nowait(doc)
+            except queue.Full:
+                return self._outcome(REJECTED, None)
+            self._recent[key] = (doc['_id'], now)
+        return self._outcome(ACCEPTED, doc['_id'])
+
+    def _outcome(self, outcome, doc_id):
+        if self.on_outcome is not None:
+            self.on_outcome(outcome)
+        return outcome, doc_id
+
+    def _prune(self, now):
+        self._recent = {key: seen for key, seen in self._recent.items() if now - seen[1] < self.dedup_window}
+        self._last_pruned = now
+
+    def _check_process(self):
+        # After a fork the parent's queue, lock and thread are copies that nothing drains
+        if self._pid != os.getpid():
+            with _fork_lock:
+                if self._pid != os.getpid():
+                    self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                    self._recent = {}
+                    self._last_pruned = time.monotonic()
+                    self._worker = None
+                    self._lock = threading.Lock()
+                    self.flushed = 0
+                    self.failed = 0
+                    self._pid = os.getpid()
+
+    def _start_worker(self):
+        # Started lazily so a worker forked after import gets its own thread,
+        # and restarted if the previous one died
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='alert-ingest', daemon=True)
+            self._worker.start()
+
+    # ----- writer thread -----
+    def _run(self):
+        while True:
+            try:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                self._flush(batch)
+            except Exception as e:
+                # One bad flush must not leave accepted documents stranded in the queue
+                print(f"Alert ingest flush failed: {e}")
+
+    def _flush(self, batch):
+        started = time.perf_counter()
+        inserted = 0
+        pending = batch
+        for attempt in range(self.retries):
+            try:
+                inserted += len(self.collection.insert_many(pending, ordered=False).inserted_ids)
+                pending = []
+                break
+            except BulkWriteError as e:
+                errors = e.details.get('writeErrors', [])
+                inserted += e.details.get('nInserted', 0)
+                # Ids are assigned up front, so a duplicate key means an earlier attempt already wrote it
+                failed = {error['index'] for error in errors if error.get('code') != DUPLICATE_KEY_ERROR}
+                pending = [doc for index, doc in enumerate(pending) if index in failed]
+            except Exception:
+                pass
+            if not pending:
+                break
+            time.sleep(0.1 * (attempt + 1))
+        with self._lock:
+            self.flushed += inserted
+            self.failed += len(pending)
+        if self.on_flush is not None:
+            try:
+                self.on_flush(inserted, time.perf_counter() - started, len(batch))
+            except Exception as e:
+                print(f"Alert ingest on_flush callback failed: {e}")
+
+    # ----- reporting -----
+    def depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self._queue.qsize(),
+                'capacity': self._queue.maxsize,
+                'flushed': self.flushed,
+                'failed': self.failed,
+                'dedupKeys': len(self._recent)
+            }
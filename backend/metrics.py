@@ -0,0 +1,205 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Metrics are plain Python objects guarded by one lock each, so recording a
+value costs a dict lookup, a bisect and an uncontended lock (around a
+microsecond). Values are per worker process.
+"""
+import threading
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def total(self):
+        with self._lock:
+            return sum(self._values.values())
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}')
+        return lines
+
+
+class Gauge:
+    """A value read from a callback at scrape time"""
+
+    def __init__(self, name, documentation, callback):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+
+    def render(self):
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} gauge',
+            f'{self.name} {_format_value(self.callback())}'
+        ]
+
+
+class Histogram:
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [count per bucket..., count above last bucket, sum]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for label_values, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                labels = _format_labels(self.labels, label_values, f'le="{_format_value(float(bound))}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f'{self.name}_sum{labels} {_format_value(series[-1])}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class RequestMetrics:
+    """
+    Per-route request count, errors, latency and body sizes.
+
+    Recorded together under one lock and one series lookup so the per-request
+    hot path stays at a few microseconds.
+    """
+
+    def __init__(self, prefix='http'):
+        self.prefix = prefix
+        self.latency_buckets = LATENCY_BUCKETS
+        self.size_buckets = SIZE_BUCKETS
+        # (method, route) -> [status counts dict, latency series, request size series, response size series]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _new_series(self):
+        return [
+            {},
+            [0] * (len(self.latency_buckets) + 1) + [0.0],
+            [0] * (len(self.size_buckets) + 1) + [0.0],
+            [0] * (len(self.size_buckets) + 1) + [0.0]
+        ]
+
+    def observe(self, method, route, status, duration, request_size, response_size):
+        latency_index = bisect_left(self.latency_buckets, duration)
+        request_index = bisect_left(self.size_buckets, request_size)
+        response_index = bisect_left(self.size_buckets, response_size)
+        key = (method, route)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = self._new_series()
+            statuses, latency, request_sizes, response_sizes = series
+            statuses[status] = statuses.get(status, 0) + 1
+            latency[latency_index] += 1
+            latency[-1] += duration
+            request_sizes[request_index] += 1
+            request_sizes[-1] += request_size
+            response_sizes[response_index] += 1
+            response_sizes[-1] += response_size
+
+    def render(self):
+        with self._lock:
+            items = sorted(
+                (key, (dict(series[0]), list(series[1]), list(series[2]), list(series[3])))
+                for key, series in self._series.items()
+            )
+        labels = ('method', 'route')
+        requests = Counter(f'{self.prefix}_requests_total', 'HTTP requests by method, route and status',
+                           labels + ('status',))
+        errors = Counter(f'{self.prefix}_request_errors_total', 'HTTP requests that returned a 5xx status', labels)
+        latency = Histogram(f'{self.prefix}_request_duration_seconds', 'Request handling latency',
+                            labels, self.latency_buckets)
+        request_size = Histogram(f'{self.prefix}_request_size_bytes', 'Request body size', labels, self.size_buckets)
+        response_size = Histogram(f'{self.prefix}_response_size_bytes', 'Response body size',
+                                  labels, self.size_buckets)
+        for key, (statuses, latency_series, request_series, response_series) in items:
+            for status, count in statuses.items():
+                requests._values[key + (str(status),)] = count
+                if status >= 500:
+                    errors._values[key] = errors._values.get(key, 0) + count
+            latency._series[key] = latency_series
+            request_size._series[key] = request_series
+            response_size._series[key] = response_series
+        return requests.render() + errors.render() + latency.render() + request_size.render() + response_size.render()
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, documentation, labels=()):
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, callback):
+        return self._register(Gauge(name, documentation, callback))
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def requests(self, prefix='http'):
+        return self._register(RequestMetrics(prefix))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,97 @@
+"""
+Convert timestamps stored as ISO strings into native BSON dates, in place.
+
+Documents are read in _id order and rewritten in batches with unordered bulk
+updates. Each update only applies while the field still holds the string that
+was read, so the script can run next to the live API and be re-run safely.
+"""
+import argparse
+import os
+import time
+from dotenv import load_dotenv
+from pymongo import MongoClient, UpdateOne
+
+from dates import parse_iso
+from read_cache import bump_versions
+
+load_dotenv()
+
+MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
+MONGO_DB_NAME = os.getenv('MONGO_DB_NAME', 'disaster_management')
+
+COLLECTIONS = {
+    'alerts': ['createdAt', 'updatedAt'],
+    'incidents': ['createdAt', 'updatedAt'],
+    'evacuation_plans': ['lastUpdated'],
+    'messages': ['timestamp'],
+    'users': ['createdAt', 'lastActive']
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Convert string timestamps to native BSON dates.')
+    parser.add_argument('--collections', nargs='+', choices=sorted(COLLECTIONS), default=sorted(COLLECTIONS),
+                        help='Collections to migrate (default: all)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Documents per bulk update')
+    parser.add_argument('--dry-run', action='store_true', help='Count what would change without writing')
+    return parser.parse_args()
+
+
+def migrate_collection(collection, fields, batch_size, dry_run):
+    """Returns (converted documents, unparseable values)"""
+    query = {'$or': [{field: {'$type': 'string'}} for field in fields]}
+    projection = {field: 1 for field in fields}
+    converted = 0
+    unparseable = 0
+    last_id = None
+    while True:
+        page = dict(query, _id={'$gt': last_id}) if last_id is not None else query
+        batch = list(collection.find(page, projection).sort('_id', 1).limit(batch_size))
+        if not batch:
+            break
+        last_id = batch[-1]['_id']
+
+        operations = []
+        for doc in batch:
+            guard = {'_id': doc['_id']}
+            changes = {}
+            for field in fields:
+                value = doc.get(field)
+                if not isinstance(value, str):
+                    continue
+                try:
+                    changes[field] = parse_iso(value)
+                    guard[field] = value
+                except ValueError:
+                    unparseable += 1
+            if changes:
+                operations.append(UpdateOne(guard, {'$set': changes}))
+        if operations and not dry_run:
+            result = collection.bulk_write(operations, ordered=False)
+            converted += result.modified_count
+        else:
+            converted += len(operations)
+    return converted, unparseable
+
+
+def main():
+    args = parse_args()
+    client = MongoClient(MONGO_URI)
+    db = client[MONGO_DB_NAME]
+
+    print(f"Migrating timestamps in {MONGO_DB_NAME}{' (dry run)' if args.dry_run else ''}...")
+    for name in args.collections:
+        started = time.perf_counter()
+        converted, unparseable = migrate_collection(db[name], COLLECTIONS[name], args.batch_size, args.dry_run)
+        elapsed = time.perf_counter() - started
+        note = f", {unparseable} unparseable values left as strings" if unparseable else ''
+        print(f"✓ {name}: {converted} documents in {elapsed:.1f}s{note}")
+        if converted and not args.dry_run:
+            # Running API nodes must drop payloads cached with the old string dates
+            bump_versions(db, [name])
+
+    client.close()
+
+
+if __name__ == '__main__':
+    main()
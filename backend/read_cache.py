@@ -0,0 +1,131 @@
+"""
+Collection versions shared across worker processes, and a read-through cache
+of serialized collection responses keyed on them.
+
+Each collection has a counter document in a small Mongo collection. Writers
+bump it; readers re-read it at most once per `check_interval` seconds, so
+a cache hit costs at most one indexed `_id` lookup instead of a full
+collection scan and re-serialization. A worker sees its own writes
+immediately and other workers' writes within `check_interval`.
+
+Bumps are coalesced per worker: a bump that starts after a write finished
+covers it, so concurrent writers to one collection wait for a single
+`$inc` in flight instead of each queueing on the counter document.
+"""
+import threading
+import time
+
+from pymongo import ReturnDocument
+
+VERSIONS_COLLECTION = 'cache_versions'
+# Versions of state derived from a collection rather than named after one
+DERIVED_VERSIONS = {'evacuation_plans': ('evacuation_routes',)}
+
+
+def bump_versions(db, names):
+    """
+    Bump the shared versions of collections rewritten outside the API (archival,
+    restores, reseeding, migrations) so running API nodes drop their cached copies.
+    """
+    for name in names:
+        for version in (name,) + DERIVED_VERSIONS.get(name, ()):
+            db[VERSIONS_COLLECTION].update_one({'_id': version}, {'$inc': {'version': 1}}, upsert=True)
+
+
+class VersionStore:
+    def __init__(self, collection, check_interval=1.0):
+        self.collection = collection
+        self.check_interval = check_interval
+        self.checks = 0
+        self.bumps = 0
+        # name -> (version, monotonic time it was last confirmed)
+        self._versions = {}
+        # name -> [bumps requested, bumps covered by a completed $inc, version it produced]
+        self._tickets = {}
+        self._bump_locks = {}
+        self._lock = threading.Lock()
+
+    def bump(self, name):
+        """Record that `name` changed (call after the write); returns a version covering it"""
+        with self._lock:
+            tickets = self._tickets.setdefault(name, [0, 0, 0])
+            tickets[0] += 1
+            ticket = tickets[0]
+            bump_lock = self._bump_locks.setdefault(name, threading.Lock())
+        with bump_lock:
+            if tickets[1] >= ticket:
+                # An $inc that started after our write already completed
+                return tickets[2]
+            with self._lock:
+                covered = tickets[0]
+            doc = self.collection.find_one_and_update(
+                {'_id': name}, {'$inc': {'version': 1}},
+                upsert=True, return_document=ReturnDocument.AFTER
+            )
+            self.bumps += 1
+            tickets[1] = covered
+            tickets[2] = doc['version']
+        self._remember(name, doc['version'])
+        return doc['version']
+
+    def current(self, name):
+        known = self._versions.get(name)
+        if known is not None and time.monotonic() - known[1] < self.check_interval:
+            return known[0]
+        self.checks += 1
+        doc = self.collection.find_one({'_id': name})
+        return self._remember(name, doc['version'] if doc else 0)
+
+    def _remember(self, name, version):
+        with self._lock:
+            known = self._versions.get(name)
+            # Never step back to an older version read by a slower concurrent check
+            if known is not None and known[0] > version:
+                version = known[0]
+            self._versions[name] = (version, time.monotonic())
+        return version
+
+
+class ReadThroughCache:
+    """Serialized response bodies per key, valid while the collection version is unchanged"""
+
+    def __init__(self, versions, singleflight=None):
+        self.versions = versions
+        self.singleflight = singleflight
+        self.hits = 0
+        self.misses = 0
+        # key -> (version, body bytes)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, collection, loader):
+        # Read the version before loading so a concurrent write can only make the entry look older
+        version = self.versions.current(collection)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            with self._lock:
+                self.hits += 1
+            return entry[1]
+
+        with self._lock:
+            self.misses += 1
+        if self.singleflight is not None:
+            body = self.singleflight.do(('read-cache', key, version), loader)
+        else:
+            body = loader()
+        with self._lock:
+            current = self._entries.get(key)
+            if current is None or current[0] <= version:
+                self._entries[key] = (version, body)
+        return body
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': sum(len(body) for _, body in self._entries.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
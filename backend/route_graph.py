@@ -0,0 +1,250 @@
+"""
+In-memory evacuation route graph with cached shortest-path trees.
+
+Every route of every evacuation plan is an undirected edge between its `from`
+and `to` places. Blocked routes are left out and congested routes cost their
+distance times a penalty. Dijkstra shortest-path trees are cached per source,
+and a route status change only drops the cached trees it can actually affect:
+
+- an edge that got worse matters only to trees that use it;
+- an edge that got better matters only to trees where it now offers a
+  shorter way to one of its endpoints.
+
+Everything else keeps answering from cache in microseconds.
+"""
+import heapq
+import re
+import threading
+from collections import OrderedDict
+
+INFINITY = float('inf')
+_DISTANCE = re.compile(r'[-+]?\d*\.?\d+')
+
+
+def parse_distance_km(distance):
+    """'8.5 km' -> 8.5, '800 m' -> 0.8; numbers pass through"""
+    if isinstance(distance, (int, float)) and not isinstance(distance, bool):
+        return float(distance)
+    match = _DISTANCE.search(str(distance or ''))
+    if not match:
+        return None
+    value = float(match.group())
+    unit = str(distance)[match.end():].strip().lower()
+    return value / 1000 if unit.startswith('m') and not unit.startswith('mi') else value
+
+
+class RouteGraph:
+    def __init__(self, congestion_penalty=2.0, max_cached_trees=512):
+        self.congestion_penalty = congestion_penalty
+        self.max_cached_trees = max_cached_trees
+        # (plan id, route id) -> route dict with parsed 'distanceKm'
+        self.routes = {}
+        # node -> {neighbour: {edge key: weight}}; only passable routes are present
+        self.adjacency = {}
+        # source -> (distances, parents); parents[node] = (previous node, edge key)
+        self.trees = OrderedDict()
+        self.loaded = False
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.RLock()
+
+    # ----- building -----
+    def weight(self, route):
+        distance = route.get('distanceKm')
+        if distance is None or route.get('status') == 'blocked':
+            return INFINITY
+        if route.get('status') == 'congested':
+            return distance * self.congestion_penalty
+        return distance
+
+    def load(self, plans, version=None):
+        """Rebuild the whole graph from evacuation plan documents"""
+        with self._lock:
+            self.routes.clear()
+            self.adjacency.clear()
+            self.trees.clear()
+            for plan in plans:
+                for key, route in self._plan_routes(plan.get('_id'), plan.get('routes')):
+                    self.routes[key] = route
+                    self._set_edge(key, route, self.weight(route))
+            self.loaded = True
+            self.version = version
+
+    def _plan_routes(self, plan_id, routes):
+        for index, route in enumerate(routes or []):
+            if not route.get('from') or not route.get('to'):
+                continue
+            key = (str(plan_id), str(route.get('id') or index))
+            yield key, {
+                'planId': str(plan_id),
+                'id': route.get('id'),
+                'name': route.get('name'),
+                'from': route['from'],
+                'to': route['to'],
+                'status': route.get('status', 'clear'),
+                'distanceKm': parse_distance_km(route.get('distance'))
+            }
+
+    def _pair_weight(self, u, v):
+        return min(self.adjacency.get(u, {}).get(v, {}).values(), default=INFINITY)
+
+    def _set_edge(self, key, route, weight):
+        u, v = route['from'], route['to']
+        for a, b in ((u, v), (v, u)):
+            edges = self.adjacency.setdefault(a, {}).setdefault(b, {})
+            if weight == INFINITY:
+                edges.pop(key, None)
+                if not edges:
+                    del self.adjacency[a][b]
+                if not self.adjacency[a]:
+                    del self.adjacency[a]
+            else:
+                edges[key] = weight
+
+    # ----- incremental updates -----
+    def update_plan(self, plan_id, routes, version=None):
+        """
+        Apply a plan's new route list, invalidating only affected cached trees.
+
+        `version` is the shared routes version this change was bumped to. The
+        patch is only applied on top of the version right before it; if other
+        changes were bumped in between (e.g. by another worker), the graph is
+        dropped so the next query reloads it.
+        """
+        with self._lock:
+            if not self.loaded:
+                return
+            if version is not None and self.version != version - 1:
+                self.drop()
+                return
+            plan_id = str(plan_id)
+            new_routes = dict(self._plan_routes(plan_id, routes))
+            old_keys = [key for key in self.routes if key[0] == plan_id]
+            for key in old_keys:
+                if key not in new_routes:
+                    self._replace_route(key, None)
+            for key, route in new_routes.items():
+                old = self.routes.get(key)
+                if old is None or old != route:
+                    self._replace_route(key, route)
+            if version is not None:
+                self.version = version
+
+    def remove_plan(self, plan_id, version=None):
+        self.update_plan(plan_id, [], version)
+
+    def drop(self):
+        """Forget the graph; it is rebuilt by the next load()"""
+        with self._lock:
+            self.invalidations += len(self.trees)
+            self.routes.clear()
+            self.adjacency.clear()
+            self.trees.clear()
+            self.loaded = False
+            self.version = None
+
+    def _replace_route(self, key, route):
+        old = self.routes.pop(key, None)
+        if old is not None:
+            self._change_edge(key, old, None)
+        if route is not None:
+            self.routes[key] = route
+            self._change_edge(key, route, route)
+
+    def _change_edge(self, key, route, new_route):
+        u, v = route['from'], route['to']
+        before = self._pair_weight(u, v)
+        edge_before = self.adjacency.get(u, {}).get(v, {}).get(key, INFINITY)
+        edge_after = self.weight(new_route) if new_route else INFINITY
+        self._set_edge(key, route, edge_after)
+        after = self._pair_weight(u, v)
+        if after != before:
+            self._invalidate(u, v, before, after)
+        elif edge_after > edge_before:
+            # A parallel route keeps the pair cost, but trees naming this route must re-pick
+            self._invalidate(u, v, before, after, key)
+
+    def _invalidate(self, u, v, before, after, key=None):
+        stale = []
+        for source, (distances, parents) in self.trees.items():
+            if key is not None:
+                if parents.get(v, (None, None))[1] == key or parents.get(u, (None, None))[1] == key:
+                    stale.append(source)
+            elif after > before:
+                # Worse: only trees that route through this pair need recomputing
+                if parents.get(v, (None,))[0] == u or parents.get(u, (None,))[0] == v:
+                    stale.append(source)
+            else:
+                # Better: only trees where the pair now shortens the way to an endpoint
+                du, dv = distances.get(u, INFINITY), distances.get(v, INFINITY)
+                if du + after < dv or dv + after < du:
+                    stale.append(source)
+        for source in stale:
+            del self.trees[source]
+        self.invalidations += len(stale)
+
+    # ----- queries -----
+    def _tree(self, source):
+        tree = self.trees.get(source)
+        if tree is not None:
+            self.trees.move_to_end(source)
+            self.hits += 1
+            return tree
+        self.misses += 1
+        distances = {source: 0.0}
+        parents = {}
+        heap = [(0.0, source)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance > distances.get(node, INFINITY):
+                continue
+            for neighbour, edges in self.adjacency.get(node, {}).items():
+                key = min(edges, key=edges.get)
+                candidate = distance + edges[key]
+                if candidate < distances.get(neighbour, INFINITY):
+                    distances[neighbour] = candidate
+                    parents[neighbour] = (node, key)
+                    heapq.heappush(heap, (candidate, neighbour))
+        tree = (distances, parents)
+        self.trees[source] = tree
+        if len(self.trees) > self.max_cached_trees:
+            self.trees.popitem(last=False)
+        return tree
+
+    def shortest_path(self, source, target):
+        """Cheapest passable path as {'cost', 'distanceKm', 'nodes', 'routes'}, or None"""
+        with self._lock:
+            if source not in self.adjacency and source != target:
+                return None
+            distances, parents = self._tree(source)
+            if target not in distances:
+                return None
+            nodes = [target]
+            hops = []
+            node = target
+            while node != source:
+                previous, key = parents[node]
+                hops.append(self.routes[key])
+                nodes.append(previous)
+                node = previous
+            nodes.reverse()
+            hops.reverse()
+            return {
+                'cost': round(distances[target], 3),
+                'distanceKm': round(sum(hop['distanceKm'] for hop in hops), 3),
+                'nodes': nodes,
+                'routes': [dict(hop) for hop in hops]
+            }
+
+    def stats(self):
+        with self._lock:
+            return {
+                'nodes': len(self.adjacency),
+                'routes': len(self.routes),
+                'cachedTrees': len(self.trees),
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations
+            }
@@ -0,0 +1,80 @@
+"""
+GeoJSON points for shelters, used by the shelters.geo 2dsphere index behind
+the nearest-shelter finder.
+
+Run as a script to backfill the points on evacuation plans written before the
+index existed. Plans are read in _id order and rewritten in batches with
+unordered bulk updates; each update only applies while the plan still holds
+the shelters that were read, so it is safe next to the live API and on re-runs.
+
+    python shelter_geo.py --dry-run
+"""
+import argparse
+import copy
+import os
+import time
+
+from dotenv import load_dotenv
+from pymongo import MongoClient, UpdateOne
+
+from read_cache import bump_versions
+
+
+def add_shelter_geo(plan):
+    """Mirror each shelter's {lat, lng} as a GeoJSON point for the 2dsphere index"""
+    for shelter in plan.get('shelters') or []:
+        coordinates = shelter.get('coordinates')
+        if coordinates and 'lat' in coordinates and 'lng' in coordinates:
+            shelter['geo'] = {'type': 'Point', 'coordinates': [coordinates['lng'], coordinates['lat']]}
+    return plan
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Add missing GeoJSON points to evacuation plan shelters.')
+    parser.add_argument('--batch-size', type=int, default=500, help='Plans per bulk update')
+    parser.add_argument('--dry-run', action='store_true', help='Count what would change without writing')
+    return parser.parse_args()
+
+
+def backfill(collection, batch_size, dry_run):
+    """Returns the number of plans given shelter points"""
+    query = {'shelters': {'$elemMatch': {'coordinates.lat': {'$exists': True}, 'geo': {'$exists': False}}}}
+    updated = 0
+    last_id = None
+    while True:
+        page = dict(query, _id={'$gt': last_id}) if last_id is not None else query
+        batch = list(collection.find(page, {'shelters': 1}).sort('_id', 1).limit(batch_size))
+        if not batch:
+            break
+        last_id = batch[-1]['_id']
+
+        operations = []
+        for plan in batch:
+            # Whole-array match: a shelter edit since the read makes this a no-op
+            guard = {'_id': plan['_id'], 'shelters': copy.deepcopy(plan['shelters'])}
+            operations.append(UpdateOne(guard, {'$set': {'shelters': add_shelter_geo(plan)['shelters']}}))
+        if not dry_run:
+            updated += collection.bulk_write(operations, ordered=False).modified_count
+        else:
+            updated += len(operations)
+    return updated
+
+
+def main():
+    load_dotenv()
+    args = parse_args()
+    client = MongoClient(os.getenv('MONGO_URI', 'mongodb://localhost:27017/'))
+    db_name = os.getenv('MONGO_DB_NAME', 'disaster_management')
+
+    started = time.perf_counter()
+    updated = backfill(client[db_name].evacuation_plans, args.batch_size, args.dry_run)
+    if updated and not args.dry_run:
+        # Running API nodes must drop their cached plan lists
+        bump_versions(client[db_name], ['evacuation_plans'])
+    print(f"✓ evacuation_plans: {updated} plans{' would be' if args.dry_run else ''} updated "
+          f"in {time.perf_counter() - started:.1f}s")
+    client.close()
+
+
+if __name__ == '__main__':
+    main()
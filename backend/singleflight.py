@@ -0,0 +1,72 @@
+import threading
+
+
+class _Call:
+    """A computation that is currently in flight for one key"""
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is still running (followers) wait for it and receive the
+    same result or exception. Nothing is cached once the leader finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+            else:
+                self.followers += 1
+                leader = False
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        """Return request counts and the share of requests that were coalesced"""
+        with self._lock:
+            leaders, followers = self.leaders, self.followers
+        total = leaders + followers
+        return {
+            'requests': total,
+            'executions': leaders,
+            'coalesced': followers,
+            'coalescingRatio': round(followers / total, 4) if total else 0.0
+        }
@@ -0,0 +1,174 @@
+"""
+Slow-operation recorder built on pymongo command monitoring.
+
+Commands slower than a threshold are kept in a bounded ring buffer together
+with their filter shape (field names and operators, values redacted). A
+background thread samples `explain` for them and flags plans that scan the
+whole collection (COLLSCAN), which points at missing indexes.
+"""
+import queue
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from pymongo import monitoring
+
+# Commands whose plan can be explained, and where their filter lives
+EXPLAINABLE = {
+    'find': lambda command: {'filter': command.get('filter', {}), 'sort': command.get('sort')},
+    'aggregate': lambda command: {'pipeline': command.get('pipeline', [])},
+    'count': lambda command: {'filter': command.get('query', {})},
+    'distinct': lambda command: {'key': command.get('key'), 'filter': command.get('query', {})},
+    'findAndModify': lambda command: {'filter': command.get('query', {}), 'sort': command.get('sort')},
+    'update': lambda command: {'filter': [update.get('q', {}) for update in command.get('updates', [])][:1]},
+    'delete': lambda command: {'filter': [delete.get('q', {}) for delete in command.get('deletes', [])][:1]}
+}
+# Recorded when slow but never explained
+RECORDED = set(EXPLAINABLE) | {'insert', 'getMore', 'createIndexes'}
+IGNORED_DATABASES = {'admin', 'config', 'local'}
+
+
+def redact(value):
+    """Keep the structure of a filter or pipeline but replace every literal with '?'"""
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if any(isinstance(item, (dict, list, tuple)) for item in value):
+            return [redact(item) for item in value]
+        return ['?'] if value else []
+    return '?'
+
+
+def summarize_plan(explain_result):
+    """Collect the stage names and index names used by the winning plan"""
+    stages = []
+    indexes = []
+
+    def walk(node, in_winning_plan):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                inside = in_winning_plan or key in ('winningPlan', 'queryPlan')
+                if key == 'stage' and in_winning_plan and isinstance(value, str):
+                    stages.append(value)
+                elif key == 'indexName' and in_winning_plan and isinstance(value, str):
+                    indexes.append(value)
+                elif key != 'rejectedPlans':
+                    walk(value, inside)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item, in_winning_plan)
+
+    walk(explain_result, False)
+    return {'stages': stages, 'indexes': sorted(set(indexes)), 'collscan': 'COLLSCAN' in stages}
+
+
+class SlowQueryRecorder(monitoring.CommandListener):
+    def __init__(self, threshold_ms=100, capacity=200, explain_sample_rate=1.0, explain_interval=60):
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        # Minimum seconds between two explains of the same command shape
+        self.explain_interval = explain_interval
+        self.entries = deque(maxlen=capacity)
+        self.total = 0
+        self.client = None
+        self._pending = {}
+        self._last_explained = {}
+        self._explain_queue = queue.Queue(maxsize=100)
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def attach(self, client):
+        """Client used to run explain; must be the client this listener is registered on"""
+        self.client = client
+
+    # ----- CommandListener -----
+    def started(self, event):
+        if event.command_name in RECORDED and event.database_name not in IGNORED_DATABASES:
+            self._pending[(event.connection_id, event.request_id)] = event.command
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed=False):
+        command = self._pending.pop((event.connection_id, event.request_id), None)
+        if command is None or event.duration_micros < self.threshold_ms * 1000:
+            return
+
+        name = event.command_name
+        collection = command.get(name) if isinstance(command.get(name), str) else None
+        shape = redact(EXPLAINABLE[name](command)) if name in EXPLAINABLE else None
+        entry = {
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'database': event.database_name,
+            'collection': collection,
+            'command': name,
+            'durationMs': round(event.duration_micros / 1000, 3),
+            'failed': failed,
+            'shape': shape,
+            'plan': None
+        }
+        with self._lock:
+            self.entries.append(entry)
+            self.total += 1
+
+        if name in EXPLAINABLE and not failed:
+            self._maybe_explain(entry, event.database_name, command)
+
+    # ----- explain sampling -----
+    def _maybe_explain(self, entry, database, command):
+        if self.client is None or random.random() > self.explain_sample_rate:
+            return
+        key = (database, entry['collection'], entry['command'], repr(entry['shape']))
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_explained.get(key, -self.explain_interval) < self.explain_interval:
+                return
+            self._last_explained[key] = now
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._explain_loop, name='slow-query-explain', daemon=True)
+                self._worker.start()
+        # Strip session, routing and concern fields that explain rejects or sets itself
+        explainable = {key: value for key, value in command.items()
+                       if not key.startswith('$') and key not in ('lsid', 'txnNumber', 'cursor', 'writeConcern', 'readConcern')}
+        if entry['command'] == 'aggregate':
+            explainable['cursor'] = {}
+        try:
+            self._explain_queue.put_nowait((entry, database, explainable))
+        except queue.Full:
+            pass
+
+    def _explain_loop(self):
+        while True:
+            entry, database, command = self._explain_queue.get()
+            try:
+                result = self.client[database].command('explain', command, verbosity='queryPlanner')
+                entry['plan'] = summarize_plan(result)
+            except Exception as e:
+                entry['plan'] = {'error': str(e)}
+
+    # ----- reporting -----
+    def snapshot(self, collscan_only=False):
+        with self._lock:
+            entries = list(self.entries)
+            total = self.total
+        if collscan_only:
+            entries = [entry for entry in entries if (entry['plan'] or {}).get('collscan')]
+        entries.reverse()
+        return {
+            'thresholdMs': self.threshold_ms,
+            'totalSlowOperations': total,
+            'collscans': sum(1 for entry in entries if (entry['plan'] or {}).get('collscan')),
+            'entries': entries
+        }
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self._last_explained.clear()
@@ -0,0 +1,330 @@
+"""
+Streaming snapshot export/import of the whole database, for backups and for
+warm-starting a test or standby node.
+
+`export` writes each collection to one compressed file, either
+<name>.ndjson.gz (relaxed Extended JSON, one document per line, readable with
+zcat | jq) or <name>.bson.gz (raw BSON, byte-exact and much cheaper to write and
+read). It also writes <name>.indexes.json and a manifest.json. `import` restores
+the files with unordered insert_many batches, and builds the indexes only after
+the data is in, which is much cheaper than maintaining them during the load.
+
+Running API nodes drop their caches of every restored collection: its shared
+cache version is bumped once the import finishes.
+
+Collections are processed in parallel worker processes. Each one streams through
+its cursor or file with at most a few batches in memory. Collections are read
+one by one, not at a single point in time, so export from a quiet database or
+a secondary if cross-collection consistency matters.
+
+    python snapshot.py export --out snapshots/latest --format bson
+    python snapshot.py import --from snapshots/latest --drop
+    python snapshot.py import --from snapshots/latest --resume   # finish an interrupted import
+"""
+import argparse
+import gzip
+import io
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from multiprocessing import Pool
+
+from bson import json_util
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from dotenv import load_dotenv
+from pymongo import IndexModel, MongoClient
+from pymongo.errors import BulkWriteError
+
+from read_cache import VERSIONS_COLLECTION, bump_versions
+
+MANIFEST = 'manifest.json'
+EXTENSIONS = {'ndjson': '.ndjson.gz', 'bson': '.bson.gz'}
+DUPLICATE_KEY_ERROR = 11000
+WRITE_BUFFER_BYTES = 1 << 20
+RAW_CODEC = CodecOptions(document_class=RawBSONDocument)
+
+
+_client = None
+
+def _worker_client(mongo_uri):
+    # One client per worker process, created after the fork
+    global _client
+    if _client is None:
+        _client = MongoClient(mongo_uri)
+    return _client
+
+
+def user_collections(db):
+    # Cache versions are per-deployment state, bumped after a restore instead of copied
+    return sorted(name for name in db.list_collection_names()
+                  if not name.startswith('system.') and name != VERSIONS_COLLECTION)
+
+
+# ============= EXPORT =============
+def _export_collection(task):
+    """Worker: stream one collection into its compressed file"""
+    mongo_uri, db_name, name, out_dir, fmt, batch_size, level = task
+    started = time.perf_counter()
+    db = _worker_client(mongo_uri)[db_name]
+    path = os.path.join(out_dir, name + EXTENSIONS[fmt])
+    documents = 0
+
+    # Written under a temporary name so an interrupted export never looks complete
+    with gzip.open(path + '.tmp', 'wb', compresslevel=level) as compressed, \
+            io.BufferedWriter(compressed, WRITE_BUFFER_BYTES) as out:
+        if fmt == 'bson':
+            # Raw documents are written as received, without decoding them
+            for doc in db.get_collection(name, codec_options=RAW_CODEC).find(batch_size=batch_size):
+                out.write(doc.raw)
+                documents += 1
+        else:
+            for doc in db[name].find(batch_size=batch_size):
+                out.write(json_util.dumps(doc, json_options=json_util.RELAXED_JSON_OPTIONS).encode())
+                out.write(b'\n')
+                documents += 1
+    os.replace(path + '.tmp', path)
+
+    indexes = [dict(spec) for spec in db[name].list_indexes()]
+    for spec in indexes:
+        spec.pop('ns', None)
+    with open(os.path.join(out_dir, name + '.indexes.json'), 'w') as f:
+        f.write(json_util.dumps(indexes, indent=2))
+    info = next(db.list_collections(filter={'name': name}), {})
+
+    return name, {
+        'file': os.path.basename(path),
+        'documents': documents,
+        'bytes': os.path.getsize(path),
+        'options': json.loads(json_util.dumps(info.get('options', {}))),
+        'seconds': round(time.perf_counter() - started, 3)
+    }
+
+
+def export_snapshot(mongo_uri, db_name, out_dir, collections=None, fmt='bson', batch_size=5000,
+                    workers=None, level=3):
+    """Export collections (default: all) into out_dir; returns the manifest"""
+    os.makedirs(out_dir, exist_ok=True)
+    if collections is None:
+        client = MongoClient(mongo_uri)
+        collections = user_collections(client[db_name])
+        client.close()
+    tasks = [(mongo_uri, db_name, name, out_dir, fmt, batch_size, level) for name in collections]
+
+    manifest = {
+        'database': db_name,
+        'format': fmt,
+        'createdAt': datetime.utcnow().isoformat() + 'Z',
+        'collections': {}
+    }
+    started = time.perf_counter()
+    with Pool(processes=max(min(workers or os.cpu_count(), len(tasks)), 1)) as pool:
+        for name, entry in pool.imap_unordered(_export_collection, tasks):
+            manifest['collections'][name] = entry
+            print(f"✓ {name}: {entry['documents']:,} documents, {entry['bytes'] / 1e6:.1f} MB "
+                  f"in {entry['seconds']}s")
+    manifest['seconds'] = round(time.perf_counter() - started, 3)
+    with open(os.path.join(out_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+# ============= IMPORT =============
+def read_documents(path, fmt):
+    """Yield documents from a snapshot file, decoding as little as possible"""
+    with gzip.open(path, 'rb') as f:
+        if fmt == 'bson':
+            while True:
+                header = f.read(4)
+                if not header:
+                    return
+                body = f.read(int.from_bytes(header, 'little') - 4)
+                yield RawBSONDocument(header + body)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json_util.loads(line)
+
+
+def read_batches(path, fmt, batch_size):
+    batch = []
+    for doc in read_documents(path, fmt):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def insert_batch(target, batch):
+    """Unordered insert; documents already present (a re-run) count as restored"""
+    try:
+        return len(target.insert_many(batch, ordered=False, bypass_document_validation=True).inserted_ids)
+    except BulkWriteError as e:
+        errors = e.details.get('writeErrors', [])
+        if any(error.get('code') != DUPLICATE_KEY_ERROR for error in errors):
+            raise
+        return e.details.get('nInserted', 0)
+
+
+def restore_indexes(target, specs):
+    models = []
+    for spec in specs:
+        if spec['name'] == '_id_':
+            continue
+        options = {key: value for key, value in spec.items() if key not in ('key', 'v', 'ns')}
+        models.append(IndexModel(list(spec['key'].items()), **options))
+    if models:
+        target.create_indexes(models)
+    return len(models)
+
+
+def _import_collection(task):
+    """Worker: load one collection file with a reader and several inserter threads"""
+    mongo_uri, db_name, in_dir, name, entry, fmt, batch_size, inserters, drop = task
+    started = time.perf_counter()
+    db = _worker_client(mongo_uri)[db_name]
+    if drop:
+        db.drop_collection(name)
+    if name not in db.list_collection_names(filter={'name': name}):
+        db.create_collection(name, **json_util.loads(json.dumps(entry.get('options', {}))))
+    target = db[name]
+
+    # Bounded, so the reader stays at most a few batches ahead of the inserters
+    batches = queue.Queue(maxsize=inserters * 2)
+    inserted = [0] * inserters
+    failures = []
+
+    def inserter(slot):
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            if failures:
+                continue
+            try:
+                inserted[slot] += insert_batch(target, batch)
+            except Exception as e:
+                failures.append(e)
+
+    threads = [threading.Thread(target=inserter, args=(slot,), daemon=True) for slot in range(inserters)]
+    for thread in threads:
+        thread.start()
+    try:
+        for batch in read_batches(os.path.join(in_dir, entry['file']), fmt, batch_size):
+            if failures:
+                break
+            batches.put(batch)
+    finally:
+        for _ in threads:
+            batches.put(None)
+        for thread in threads:
+            thread.join()
+    if failures:
+        raise failures[0]
+    loaded = time.perf_counter()
+
+    with open(os.path.join(in_dir, name + '.indexes.json')) as f:
+        indexes = restore_indexes(db[name], json_util.loads(f.read()))
+
+    return name, {
+        'documents': sum(inserted),
+        'indexes': indexes,
+        'loadSeconds': round(loaded - started, 3),
+        'indexSeconds': round(time.perf_counter() - loaded, 3)
+    }
+
+
+def import_snapshot(mongo_uri, db_name, in_dir, collections=None, batch_size=5000, workers=None,
+                    inserters=4, drop=False, resume=False):
+    """
+    Restore a snapshot directory into db_name; returns per-collection results.
+
+    Non-empty targets are refused unless `drop` (replace them) or `resume`
+    (insert what is missing; documents already present by _id are skipped).
+    """
+    with open(os.path.join(in_dir, MANIFEST)) as f:
+        manifest = json.load(f)
+    entries = {name: entry for name, entry in manifest['collections'].items()
+               if (collections is None or name in collections) and name != VERSIONS_COLLECTION}
+
+    if not drop and not resume:
+        client = MongoClient(mongo_uri)
+        db = client[db_name]
+        occupied = [name for name in entries if db[name].estimated_document_count()]
+        client.close()
+        if occupied:
+            raise SystemExit(f"Target collections are not empty: {', '.join(occupied)}"
+                             " (use --drop to replace them, or --resume to finish an interrupted import)")
+
+    tasks = [(mongo_uri, db_name, in_dir, name, entry, manifest['format'], batch_size, inserters, drop)
+             for name, entry in entries.items()]
+    results = {}
+    with Pool(processes=max(min(workers or os.cpu_count(), len(tasks)), 1)) as pool:
+        for name, result in pool.imap_unordered(_import_collection, tasks):
+            results[name] = result
+            rate = result['documents'] / result['loadSeconds'] if result['loadSeconds'] else 0
+            print(f"✓ {name}: {result['documents']:,} documents in {result['loadSeconds']}s "
+                  f"({rate:,.0f} docs/s), {result['indexes']} indexes in {result['indexSeconds']}s")
+
+    # After the load, so no node can re-cache pre-restore data under the new version
+    client = MongoClient(mongo_uri)
+    bump_versions(client[db_name], results)
+    client.close()
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Export or restore a compressed snapshot of the database.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help='Write every collection to a compressed file')
+    export.add_argument('--out', required=True, help='Snapshot directory to create')
+    export.add_argument('--format', choices=sorted(EXTENSIONS), default='bson',
+                        help='bson (exact, fastest) or ndjson (Extended JSON lines)')
+    export.add_argument('--level', type=int, default=3, choices=range(1, 10), metavar='1-9',
+                        help='gzip compression level')
+
+    restore = commands.add_parser('import', help='Restore a snapshot directory')
+    restore.add_argument('--from', dest='source', required=True, help='Snapshot directory to read')
+    existing = restore.add_mutually_exclusive_group()
+    existing.add_argument('--drop', action='store_true', help='Replace collections that already hold data')
+    existing.add_argument('--resume', action='store_true',
+                          help='Keep existing documents and insert only the missing ones')
+    restore.add_argument('--inserters', type=int, default=4, help='Concurrent insert_many calls per collection')
+
+    for command in (export, restore):
+        command.add_argument('--collections', nargs='+', help='Only these collections (default: all)')
+        command.add_argument('--batch-size', type=int, default=5000, help='Documents per batch')
+        command.add_argument('--workers', type=int, default=None,
+                             help='Collections processed at once (default: CPU count)')
+    return parser.parse_args()
+
+
+def main():
+    load_dotenv()
+    args = parse_args()
+    mongo_uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
+    db_name = os.getenv('MONGO_DB_NAME', 'disaster_management')
+
+    started = time.perf_counter()
+    if args.command == 'export':
+        manifest = export_snapshot(mongo_uri, db_name, args.out, args.collections, args.format,
+                                   args.batch_size, args.workers, args.level)
+        total = sum(entry['documents'] for entry in manifest['collections'].values())
+        size = sum(entry['bytes'] for entry in manifest['collections'].values())
+        print(f"\n✅ Exported {total:,} documents ({size / 1e6:.1f} MB) to {args.out} "
+              f"in {time.perf_counter() - started:.1f}s")
+    else:
+        results = import_snapshot(mongo_uri, db_name, args.source, args.collections, args.batch_size,
+                                  args.workers, args.inserters, args.drop, args.resume)
+        total = sum(result['documents'] for result in results.values())
+        print(f"\n✅ Restored {total:,} documents into {db_name} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
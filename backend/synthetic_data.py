@@ -0,0 +1,272 @@
+"""
+Deterministic synthetic data for scale testing, used by seed_data.py --incidents etc.
+
+Each collection is split into fixed-size chunks. A chunk's documents depend only
+on (seed, collection, chunk index), so the output is reproducible no matter how
+many worker processes generate it or in which order chunks finish.
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+
+from pymongo import MongoClient
+
+CHUNK_SIZE = 50000
+
+# City centres used to scatter coordinates across India
+CITIES = [
+    ('Mumbai', 'Maharashtra', 19.0760, 72.8777),
+    ('Delhi', 'Delhi', 28.6139, 77.2090),
+    ('Chennai', 'Tamil Nadu', 13.0827, 80.2707),
+    ('Kolkata', 'West Bengal', 22.5726, 88.3639),
+    ('Bangalore', 'Karnataka', 12.9716, 77.5946),
+    ('Hyderabad', 'Telangana', 17.3850, 78.4867),
+    ('Ahmedabad', 'Gujarat', 23.0225, 72.5714),
+    ('Pune', 'Maharashtra', 18.5204, 73.8567),
+    ('Jaipur', 'Rajasthan', 26.9124, 75.7873),
+    ('Lucknow', 'Uttar Pradesh', 26.8467, 80.9462),
+    ('Guwahati', 'Assam', 26.1445, 91.7362),
+    ('Bhubaneswar', 'Odisha', 20.2961, 85.8245),
+    ('Patna', 'Bihar', 25.5941, 85.1376),
+    ('Kochi', 'Kerala', 9.9312, 76.2673),
+    ('Srinagar', 'Jammu & Kashmir', 34.0837, 74.7973),
+    ('Dehradun', 'Uttarakhand', 30.3165, 78.0322),
+    ('Visakhapatnam', 'Andhra Pradesh', 17.6868, 83.2185),
+    ('Bhopal', 'Madhya Pradesh', 23.2599, 77.4126)
+]
+INDIA_BOUNDS = {'lat': (6.5, 35.5), 'lng': (68.0, 97.5)}
+
+HAZARDS = [
+    ('Flash Flood', 'natural', 'Natural Disaster'),
+    ('Cyclone', 'natural', 'Natural Disaster'),
+    ('Landslide', 'natural', 'Natural Disaster'),
+    ('Earthquake', 'natural', 'Natural Disaster'),
+    ('Heat Wave', 'natural', 'Natural Disaster'),
+    ('Building Collapse', 'man-made', 'Structural Failure'),
+    ('Chemical Leak', 'man-made', 'Industrial Accident'),
+    ('Factory Fire', 'man-made', 'Fire'),
+    ('Highway Pile-up', 'man-made', 'Accident'),
+    ('Dengue Outbreak', 'health', 'Medical Emergency'),
+    ('Crowd Crush', 'security', 'Other')
+]
+SEVERITIES = (['critical', 'high', 'medium', 'low'], [1, 3, 4, 2])
+ALERT_STATUSES = (['active', 'monitoring', 'resolved'], [2, 2, 6])
+INCIDENT_STATUSES = (['reported', 'investigating', 'responding', 'resolved'], [1, 1, 2, 6])
+TEAM_TYPES = ['fire', 'medical', 'police', 'rescue', 'evacuation']
+RESOURCE_TYPES = {
+    'personnel': ['NDRF Personnel', 'Paramedics', 'Volunteers'],
+    'equipment': ['Inflatable Boats', 'Water Purification Units', 'Generators', 'Cutting Tools'],
+    'supplies': ['Emergency Medical Kits', 'Tents', 'Food Packets', 'Blankets'],
+    'vehicle': ['Ambulances', 'Fire Trucks', 'Rescue Helicopters', 'Water Tankers']
+}
+FACILITIES = ['Food', 'Water', 'Medical Aid', 'Restrooms', 'Power Backup', 'Child Care']
+PRIORITIES = (['urgent', 'high', 'normal', 'low'], [1, 2, 5, 2])
+MESSAGE_STATUSES = (['sent', 'delivered', 'read'], [2, 3, 5])
+
+
+def _weighted(rng, choices):
+    values, weights = choices
+    return rng.choices(values, weights)[0]
+
+
+def _random_moment(rng, now, max_days):
+    return now - timedelta(seconds=rng.randrange(max_days * 86400))
+
+
+def _point_near_city(rng, city, spread=0.6):
+    """Random coordinates around a city centre, clamped to India's bounding box"""
+    _, _, lat, lng = city
+    lat = min(max(rng.gauss(lat, spread), INDIA_BOUNDS['lat'][0]), INDIA_BOUNDS['lat'][1])
+    lng = min(max(rng.gauss(lng, spread), INDIA_BOUNDS['lng'][0]), INDIA_BOUNDS['lng'][1])
+    return {'lat': round(lat, 4), 'lng': round(lng, 4)}
+
+
+def make_alert(rng, index, now):
+    hazard, alert_type, _ = rng.choice(HAZARDS)
+    city = rng.choice(CITIES)
+    created = _random_moment(rng, now, 365)
+    return {
+        'title': f'{hazard} Warning - {city[0]}',
+        'severity': _weighted(rng, SEVERITIES),
+        'type': alert_type,
+        'location': f'{city[0]}, {city[1]}',
+        'description': f'{hazard} reported near {city[0]}. Residents advised to follow official instructions.',
+        'status': _weighted(rng, ALERT_STATUSES),
+        'createdAt': created,
+        'updatedAt': created + timedelta(minutes=rng.randrange(1, 720))
+    }
+
+
+def make_incident(rng, index, now):
+    hazard, _, incident_type = rng.choice(HAZARDS)
+    city = rng.choice(CITIES)
+    created = _random_moment(rng, now, 365)
+    return {
+        'title': f'{hazard} in {city[0]} #{index}',
+        'type': incident_type,
+        'severity': _weighted(rng, SEVERITIES),
+        'location': f'{city[0]}, {city[1]}',
+        'coordinates': _point_near_city(rng, city),
+        'description': f'{hazard} reported by local authorities near {city[0]}. Teams assessing the situation.',
+        'reportedBy': rng.choice(['Control Room', 'Fire Brigade', 'Police Control', 'Citizen Report', 'NHAI']),
+        'status': _weighted(rng, INCIDENT_STATUSES),
+        'assignedTeam': f'Team {rng.randrange(1000)}',
+        'createdAt': created,
+        'updatedAt': created + timedelta(minutes=rng.randrange(1, 2880))
+    }
+
+
+def make_team(rng, index, now):
+    team_type = rng.choice(TEAM_TYPES)
+    return {
+        'name': f'Team {index}',
+        'type': team_type,
+        'leader': f'Officer {index}',
+        'members': [f'Member {index}-{m}' for m in range(rng.randrange(3, 9))],
+        'status': rng.choice(['available', 'deployed', 'training']),
+        'location': rng.choice(CITIES)[0],
+        'equipment': rng.sample(['Rescue Equipment', 'Medical Supplies', 'Communication Devices',
+                                 'Breathing Apparatus', 'Ladders'], 2),
+        'contact': f'+91-9{rng.randrange(10 ** 9):09d}'
+    }
+
+
+def make_resource(rng, index, now):
+    resource_type = rng.choice(list(RESOURCE_TYPES))
+    quantity = rng.randrange(5, 1000)
+    return {
+        'name': f'{rng.choice(RESOURCE_TYPES[resource_type])} #{index}',
+        'type': resource_type,
+        'quantity': quantity,
+        'available': rng.randrange(0, quantity + 1),
+        'location': rng.choice(CITIES)[0],
+        'status': rng.choice(['available', 'available', 'deployed', 'maintenance'])
+    }
+
+
+def make_evacuation_plan(rng, index, now):
+    city = rng.choice(CITIES)
+    shelters = []
+    for s in range(rng.randrange(2, 7)):
+        capacity = rng.randrange(500, 20000, 500)
+        coordinates = _point_near_city(rng, city, spread=0.15)
+        shelters.append({
+            'id': f'shelter-{index}-{s}',
+            'name': f'{city[0]} Relief Camp {index}-{s}',
+            'location': city[0],
+            'coordinates': coordinates,
+            # GeoJSON copy for the shelters.geo 2dsphere index used by the shelter finder
+            'geo': {'type': 'Point', 'coordinates': [coordinates['lng'], coordinates['lat']]},
+            'capacity': capacity,
+            'currentOccupancy': rng.randrange(0, capacity // 2),
+            'facilities': rng.sample(FACILITIES, rng.randrange(2, len(FACILITIES))),
+            'contact': f'+91-9{rng.randrange(10 ** 9):09d}',
+            'status': 'operational'
+        })
+    # Routes chain evacuation points towards the shelters so they form a connected graph
+    points = [f'{city[0]} Zone {index}-{p}' for p in range(rng.randrange(2, 5))]
+    routes = []
+    for r in range(rng.randrange(2, 9)):
+        distance = round(rng.uniform(1.0, 25.0), 1)
+        routes.append({
+            'id': f'route-{index}-{r}',
+            'name': f'Evacuation Route {index}-{r}',
+            'from': rng.choice(points),
+            'to': rng.choice(points + [shelter['name'] for shelter in shelters]),
+            'distance': f'{distance} km',
+            'estimatedTime': f'{int(distance * 3)} minutes',
+            'status': rng.choice(['clear', 'clear', 'clear', 'congested', 'blocked'])
+        })
+    return {
+        'name': f'{city[0]} Evacuation Plan {index}',
+        'area': f'{city[0]} District {index}',
+        'capacity': sum(shelter['capacity'] for shelter in shelters),
+        'shelters': shelters,
+        'routes': routes,
+        'status': rng.choice(['active', 'active', 'inactive', 'under-review']),
+        'lastUpdated': _random_moment(rng, now, 90)
+    }
+
+
+def make_message(rng, index, now):
+    return {
+        'from': rng.choice(['Control Room Delhi', 'NDRF HQ', 'Emergency Command', 'Weather Monitoring']),
+        'to': f'Team {rng.randrange(1000)}',
+        'subject': rng.choice(['Status Update', 'Deployment Request', 'Supply Request', 'Weather Advisory']),
+        'content': f'Message {index}: confirm current status, location and resource needs.',
+        'priority': _weighted(rng, PRIORITIES),
+        'status': _weighted(rng, MESSAGE_STATUSES),
+        'timestamp': _random_moment(rng, now, 180)
+    }
+
+
+# Collection name -> document factory
+GENERATORS = {
+    'alerts': make_alert,
+    'incidents': make_incident,
+    'teams': make_team,
+    'resources': make_resource,
+    'evacuation_plans': make_evacuation_plan,
+    'messages': make_message
+}
+
+
+def _insert_chunk(task):
+    """Worker: generate one chunk and insert it in unordered batches"""
+    mongo_uri, db_name, collection, chunk, start, count, seed, now, batch_size = task
+    rng = random.Random(f'{seed}:{collection}:{chunk}')
+    make = GENERATORS[collection]
+    target = _worker_client(mongo_uri)[db_name][collection]
+    batch = []
+    for index in range(start, start + count):
+        batch.append(make(rng, index, now))
+        if len(batch) >= batch_size:
+            target.insert_many(batch, ordered=False, bypass_document_validation=True)
+            batch = []
+    if batch:
+        target.insert_many(batch, ordered=False, bypass_document_validation=True)
+    return collection, count
+
+
+_client = None
+
+def _worker_client(mongo_uri):
+    # One client per worker process, created after the fork
+    global _client
+    if _client is None:
+        _client = MongoClient(mongo_uri)
+    return _client
+
+
+def generate(mongo_uri, db_name, counts, seed=42, batch_size=5000, workers=None, anchor=None):
+    """
+    Insert counts[collection] synthetic documents into each collection.
+
+    Timestamps are spread backwards from `anchor` (default: today at midnight
+    UTC), so the same seed and anchor always produce the same documents.
+    """
+    now = anchor or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    tasks = []
+    for collection, total in counts.items():
+        for chunk, start in enumerate(range(0, total, CHUNK_SIZE)):
+            count = min(CHUNK_SIZE, total - start)
+            tasks.append((mongo_uri, db_name, collection, chunk, start, count, seed, now, batch_size))
+    if not tasks:
+        return
+
+    done = {collection: 0 for collection in counts}
+    started = time.perf_counter()
+    inserted = 0
+    with Pool(processes=workers or os.cpu_count()) as pool:
+        for collection, count in pool.imap_unordered(_insert_chunk, tasks):
+            done[collection] += count
+            inserted += count
+            rate = inserted / (time.perf_counter() - started)
+            progress = ', '.join(f'{name} {done[name]:,}/{counts[name]:,}' for name in counts)
+            sys.stdout.write(f'\r  {progress} ({rate:,.0f} docs/s)')
+            sys.stdout.flush()
+    elapsed = time.perf_counter() - started
+    print(f'\n✓ Generated {inserted:,} documents in {elapsed:.1f}s ({inserted / elapsed:,.0f} docs/s)')
@@ -110,16 +110,18 @@ export function ResourceManagement() {
     }
   };
 
-  const handleDeployResource = (resourceId: string, quantity: number) => {
-    setResources(resources.map(resource =>
-      resource.id === resourceId
-        ? {
-          ...resource,
-          available: Math.max(0, resource.available - quantity),
-          status: resource.available - quantity === 0 ? 'deployed' : resource.status
-        }
-        : resource
-    ));
+  const handleDeployResource = async (resourceId: string, quantity: number) => {
+    try {
+      // Reserved atomically on the server so concurrent dispatchers can't overbook
+      const updated = await api.resources.reserve(resourceId, quantity);
+      setResources(prevResources => prevResources.map(resource =>
+        resource.id === resourceId ? updated : resource
+      ));
+    } catch (error) {
+      console.error('Error deploying resource:', error);
+      alert(`Failed to deploy resource: ${error instanceof Error ? error.message : 'unknown error'}`);
+      await loadResources();
+    }
   };
 
   const getStatusColor = (status: string) => {
@@ -1,18 +1,46 @@
-import { Alert, Resource, Incident, Team, EvacuationPlan, WeatherData, Message, User } from '../types';
+import { Alert, Resource, Incident, Team, EvacuationPlan, WeatherData, Message, User, SearchResponse, CollectionStats, Shelter, AvailableShelter, ShortestPath, IncidentHeatmap, BroadcastRecipients, BroadcastResult, MessageSelection, AcknowledgeResult } from '../types';
 
 // API Service for Backend Communication
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000/api';
 
+// ============= READ-YOUR-WRITES =============
+// The server may answer list/search/analytics reads from Mongo secondaries.
+// For a while after this client writes, its reads ask for the primary so
+// they always include its own changes (90s is Mongo's smallest maxStalenessSeconds).
+const READ_YOUR_WRITES_MS = 90_000;
+let lastWriteAt = 0;
+
+function readPreferenceHeaders(): Record<string, string> {
+    return Date.now() - lastWriteAt < READ_YOUR_WRITES_MS ? { 'X-Read-Preference': 'primary' } : {};
+}
+
+// Error for a response the server sent, carrying its HTTP status
+export class ApiError extends Error {
+    status: number;
+
+    constructor(message: string, status: number) {
+        super(message);
+        this.name = 'ApiError';
+        this.status = status;
+    }
+}
+
 // Generic API call function with better error handling
-async function apiCall<T>(endpoint: string, options: RequestInit = {}): Promise<T> {
+async function directCall<T>(endpoint: string, options: RequestInit = {}): Promise<T> {
+    const method = (options.method || 'GET').toUpperCase();
     try {
         const response = await fetch(`${API_BASE_URL}${endpoint}`, {
+            ...options,
             headers: {
                 'Content-Type': 'application/json',
+                ...readPreferenceHeaders(),
                 ...options.headers,
             },
-            ...options,
         });
+        // A batch of GETs is not a write
+        if (method !== 'GET' && endpoint !== '/batch') {
+            lastWriteAt = Date.now();
+        }
 
         // Check if response is ok
         if (!response.ok) {
@@ -34,7 +62,7 @@ async function apiCall<T>(endpoint: string, options: RequestInit = {}): Promise<
                     // If we can't read at all, use default message
                 }
             }
-            throw new Error(errorMessage);
+            throw new ApiError(errorMessage, response.status);
         }
 
         // Parse the response as JSON (our API always returns JSON)
@@ -50,6 +78,83 @@ async function apiCall<T>(endpoint: string, options: RequestInit = {}): Promise<
     }
 }
 
+// ============= REQUEST BATCHING =============
+// GETs issued in the same tick (e.g. one screen's Promise.all) are sent as a
+// single POST /batch round trip; the server runs them concurrently.
+const MAX_BATCH_SIZE = 25;
+
+interface BatchResponseItem {
+    id: string;
+    status: number;
+    body: any;
+}
+
+interface QueuedRequest {
+    endpoint: string;
+    resolve: (value: any) => void;
+    reject: (reason: unknown) => void;
+}
+
+let batchQueue: QueuedRequest[] = [];
+
+async function sendBatch(queued: QueuedRequest[]) {
+    if (queued.length === 1) {
+        const [only] = queued;
+        directCall(only.endpoint).then(only.resolve, only.reject);
+        return;
+    }
+    try {
+        const { responses } = await directCall<{ responses: BatchResponseItem[] }>('/batch', {
+            method: 'POST',
+            body: JSON.stringify({
+                requests: queued.map((item, index) => ({ id: String(index), method: 'GET', path: `/api${item.endpoint}` })),
+            }),
+        });
+        responses.forEach((response, index) => {
+            const { resolve, reject } = queued[index];
+            if (response.status >= 200 && response.status < 300) {
+                resolve(response.body);
+            } else {
+                const message = response.body?.error || response.body?.message || `HTTP error! status: ${response.status}`;
+                reject(new Error(message));
+            }
+        });
+    } catch (error) {
+        if (error instanceof ApiError && error.status !== 404 && error.status !== 405) {
+            // The server answered (e.g. 503/429 when overloaded); retrying each call separately would only add load
+            queued.forEach(item => item.reject(error));
+            return;
+        }
+        // Older servers without /batch, or a network error: fall back to one request per call
+        queued.forEach(item => directCall(item.endpoint).then(item.resolve, item.reject));
+    }
+}
+
+function flushBatch() {
+    const queued = batchQueue;
+    batchQueue = [];
+    for (let start = 0; start < queued.length; start += MAX_BATCH_SIZE) {
+        sendBatch(queued.slice(start, start + MAX_BATCH_SIZE));
+    }
+}
+
+function batchedGet<T>(endpoint: string): Promise<T> {
+    return new Promise<T>((resolve, reject) => {
+        if (batchQueue.length === 0) {
+            queueMicrotask(flushBatch);
+        }
+        batchQueue.push({ endpoint, resolve, reject });
+    });
+}
+
+// Plain GETs go through the batcher; anything with a method, body or headers is sent directly
+function apiCall<T>(endpoint: string, options: RequestInit = {}): Promise<T> {
+    if (Object.keys(options).length === 0) {
+        return batchedGet<T>(endpoint);
+    }
+    return directCall<T>(endpoint, options);
+}
+
 // Type for creating alerts (without id, createdAt, updatedAt)
 type CreateAlertData = Omit<Alert, 'id' | 'createdAt' | 'updatedAt'>;
 
@@ -70,8 +175,12 @@ type CreateMessageData = Omit<Message, 'id'>;
 
 // ============= ALERTS API =============
 export const alertsAPI = {
-    getAll: async () => {
-        return apiCall<Alert[]>('/alerts');
+    getAll: async (includeArchived = false) => {
+        return apiCall<Alert[]>(includeArchived ? '/alerts?includeArchived=true' : '/alerts');
+    },
+
+    getStats: async () => {
+        return apiCall<CollectionStats>('/alerts/stats');
     },
 
     getById: async (id: string) => {
@@ -104,6 +213,10 @@ export const resourcesAPI = {
         return apiCall<Resource[]>('/resources');
     },
 
+    getStats: async () => {
+        return apiCall<CollectionStats>('/resources/stats');
+    },
+
     create: async (data: CreateResourceData) => {
         return apiCall<Resource>('/resources', {
             method: 'POST',
@@ -123,12 +236,46 @@ export const resourcesAPI = {
             method: 'DELETE',
         });
     },
+
+    reserve: async (id: string, quantity: number) => {
+        return apiCall<Resource>(`/resources/${id}/reserve`, {
+            method: 'POST',
+            body: JSON.stringify({ quantity }),
+        });
+    },
+
+    release: async (id: string, quantity: number) => {
+        return apiCall<Resource>(`/resources/${id}/release`, {
+            method: 'POST',
+            body: JSON.stringify({ quantity }),
+        });
+    },
+
+    reserveBatch: async (items: Array<{ id: string; quantity: number }>) => {
+        return apiCall<{ reserved: Resource[] }>('/resources/reserve', {
+            method: 'POST',
+            body: JSON.stringify({ items }),
+        });
+    },
 };
 
 // ============= INCIDENTS API =============
 export const incidentsAPI = {
-    getAll: async () => {
-        return apiCall<Incident[]>('/incidents');
+    getAll: async (includeArchived = false) => {
+        return apiCall<Incident[]>(includeArchived ? '/incidents?includeArchived=true' : '/incidents');
+    },
+
+    getStats: async () => {
+        return apiCall<CollectionStats>('/incidents/stats');
+    },
+
+    // bbox is [minLng, minLat, maxLng, maxLat]; required above zoom 6
+    getHeatmap: async (zoom: number, window = 'all', severity: Incident['severity'][] = [],
+                       bbox?: [number, number, number, number]) => {
+        const query = new URLSearchParams({ zoom: String(zoom), window });
+        if (severity.length) query.set('severity', severity.join(','));
+        if (bbox) query.set('bbox', bbox.join(','));
+        return apiCall<IncidentHeatmap>(`/incidents/heatmap?${query.toString()}`);
     },
 
     create: async (data: CreateIncidentData) => {
@@ -158,6 +305,10 @@ export const teamsAPI = {
         return apiCall<Team[]>('/teams');
     },
 
+    getStats: async () => {
+        return apiCall<CollectionStats>('/teams/stats');
+    },
+
     create: async (data: CreateTeamData) => {
         return apiCall<Team>('/teams', {
             method: 'POST',
@@ -185,6 +336,10 @@ export const evacuationPlansAPI = {
         return apiCall<EvacuationPlan[]>('/evacuation-plans');
     },
 
+    getStats: async () => {
+        return apiCall<CollectionStats>('/evacuation-plans/stats');
+    },
+
     create: async (data: CreateEvacuationPlanData) => {
         return apiCall<EvacuationPlan>('/evacuation-plans', {
             method: 'POST',
@@ -204,12 +359,58 @@ export const evacuationPlansAPI = {
             method: 'DELETE',
         });
     },
+
+    checkIn: async (planId: string, shelterId: string, count = 1) => {
+        return apiCall<Shelter>(`/evacuation-plans/${planId}/shelters/${encodeURIComponent(shelterId)}/checkin`, {
+            method: 'POST',
+            body: JSON.stringify({ count }),
+        });
+    },
+
+    checkOut: async (planId: string, shelterId: string, count = 1) => {
+        return apiCall<Shelter>(`/evacuation-plans/${planId}/shelters/${encodeURIComponent(shelterId)}/checkout`, {
+            method: 'POST',
+            body: JSON.stringify({ count }),
+        });
+    },
+};
+
+// ============= SHELTERS API =============
+export interface ShelterSearchParams {
+    lat?: number;
+    lng?: number;
+    location?: string;
+    minFree?: number;
+    maxDistanceKm?: number;
+    limit?: number;
+}
+
+export const sheltersAPI = {
+    findAvailable: async (params: ShelterSearchParams) => {
+        const query = new URLSearchParams();
+        Object.entries(params).forEach(([key, value]) => {
+            if (value !== undefined) query.set(key, String(value));
+        });
+        return apiCall<AvailableShelter[]>(`/shelters/available?${query.toString()}`);
+    },
+};
+
+// ============= EVACUATION ROUTES API =============
+export const evacuationRoutesAPI = {
+    shortestPath: async (from: string, to: string) => {
+        const query = new URLSearchParams({ from, to });
+        return apiCall<ShortestPath>(`/evacuation-routes/shortest-path?${query.toString()}`);
+    },
 };
 
 // ============= MESSAGES API =============
 export const messagesAPI = {
-    getAll: async () => {
-        return apiCall<Message[]>('/messages');
+    getAll: async (includeArchived = false) => {
+        return apiCall<Message[]>(includeArchived ? '/messages?includeArchived=true' : '/messages');
+    },
+
+    getStats: async () => {
+        return apiCall<CollectionStats>('/messages/stats');
     },
 
     create: async (data: CreateMessageData) => {
@@ -218,6 +419,27 @@ export const messagesAPI = {
             body: JSON.stringify(data),
         });
     },
+
+    broadcast: async (data: Omit<CreateMessageData, 'to' | 'status'>, recipients: BroadcastRecipients) => {
+        return apiCall<BroadcastResult>('/messages/broadcast', {
+            method: 'POST',
+            body: JSON.stringify({ ...data, recipients }),
+        });
+    },
+
+    markDelivered: async (selection: MessageSelection) => {
+        return apiCall<AcknowledgeResult>('/messages/delivered', {
+            method: 'POST',
+            body: JSON.stringify(selection),
+        });
+    },
+
+    markRead: async (selection: MessageSelection) => {
+        return apiCall<AcknowledgeResult>('/messages/read', {
+            method: 'POST',
+            body: JSON.stringify(selection),
+        });
+    },
 };
 
 // ============= WEATHER API =============
@@ -241,6 +463,29 @@ export const analyticsAPI = {
     },
 };
 
+// ============= SEARCH API =============
+export interface SearchParams {
+    types?: Array<'alert' | 'incident' | 'message'>;
+    status?: string;
+    severity?: string;
+    page?: number;
+    pageSize?: number;
+    withTotal?: boolean;
+}
+
+export const searchAPI = {
+    query: async (q: string, params: SearchParams = {}) => {
+        const query = new URLSearchParams({ q });
+        if (params.types && params.types.length) query.set('types', params.types.join(','));
+        if (params.status) query.set('status', params.status);
+        if (params.severity) query.set('severity', params.severity);
+        if (params.page) query.set('page', String(params.page));
+        if (params.pageSize) query.set('pageSize', String(params.pageSize));
+        if (params.withTotal) query.set('withTotal', 'true');
+        return apiCall<SearchResponse>(`/search?${query.toString()}`);
+    },
+};
+
 // ============= USERS API =============
 export const usersAPI = {
     getAll: async () => {
@@ -254,8 +499,11 @@ export default {
     incidents: incidentsAPI,
     teams: teamsAPI,
     evacuationPlans: evacuationPlansAPI,
+    shelters: sheltersAPI,
+    evacuationRoutes: evacuationRoutesAPI,
     messages: messagesAPI,
     weather: weatherAPI,
     analytics: analyticsAPI,
+    search: searchAPI,
     users: usersAPI,
 };
\ No newline at end of file
@@ -9,6 +9,7 @@ export interface Alert {
   status: 'active' | 'resolved' | 'monitoring';
   createdAt: string;
   updatedAt: string;
+  archivedAt?: string;
 }
 
 export interface Resource {
@@ -35,6 +36,21 @@ export interface Incident {
   assignedTeam?: string;
   createdAt: string;
   updatedAt: string;
+  archivedAt?: string;
+}
+
+export interface IncidentHeatmap {
+  zoom: number;
+  cellSizeDeg: number;
+  origin: { lat: number; lng: number };
+  // [minLng, minLat, maxLng, maxLat] snapped to cells, or null for the whole world
+  bbox: [number, number, number, number] | null;
+  window: string;
+  severity: Incident['severity'][];
+  total: number;
+  max: number;
+  // [x, y, count]; cell (x, y) starts at origin + (x, y) * cellSizeDeg
+  cells: [number, number, number][];
 }
 
 export interface Team {
@@ -64,6 +80,7 @@ export interface Shelter {
   id: string;
   name: string;
   location: string;
+  coordinates?: { lat: number; lng: number };
   capacity: number;
   currentOccupancy: number;
   facilities: string[];
@@ -123,6 +140,35 @@ export interface Message {
   priority: 'urgent' | 'high' | 'normal' | 'low';
   status: 'sent' | 'delivered' | 'read';
   timestamp: string;
+  broadcastId?: string;
+  deliveredAt?: string;
+  readAt?: string;
+  archivedAt?: string;
+}
+
+// A list of recipient names, every team, every team leader, or teams matching a filter
+export type BroadcastRecipients =
+  | string[]
+  | 'all-teams'
+  | 'team-leaders'
+  | { teams: { type?: Team['type']; status?: Team['status'] }; address?: 'name' | 'leader' };
+
+export interface BroadcastResult {
+  broadcastId: string;
+  recipients: number;
+  messageIds: string[];
+}
+
+export interface MessageSelection {
+  ids?: string[];
+  broadcastId?: string;
+  to?: string;
+}
+
+export interface AcknowledgeResult {
+  status: 'delivered' | 'read';
+  matched: number;
+  modified: number;
 }
 
 export interface User {
@@ -132,4 +178,53 @@ export interface User {
   department: string;
   contact: string;
   lastActive: string;
-}
\ No newline at end of file
+}
+export interface SearchHit {
+  type: 'alert' | 'incident' | 'message';
+  score: number;
+  item: Alert | Incident | Message;
+}
+
+export interface SearchResponse {
+  query: string;
+  page: number;
+  pageSize: number;
+  // Only present when requested with withTotal
+  total?: number;
+  results: SearchHit[];
+}
+
+export interface CollectionStats {
+  total: number;
+  status: Record<string, number>;
+  severity?: Record<string, number>;
+  type?: Record<string, number>;
+  priority?: Record<string, number>;
+}
+
+export interface RouteHop {
+  planId: string;
+  id: string;
+  name: string;
+  from: string;
+  to: string;
+  status: Route['status'];
+  distanceKm: number;
+}
+
+export interface ShortestPath {
+  from: string;
+  to: string;
+  cost: number;
+  distanceKm: number;
+  nodes: string[];
+  routes: RouteHop[];
+}
+
+export interface AvailableShelter {
+  planId: string;
+  planName: string;
+  shelter: Shelter;
+  freeCapacity: number;
+  distanceKm?: number;
+}